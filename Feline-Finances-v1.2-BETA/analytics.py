@@ -0,0 +1,144 @@
+import datetime
+from collections import deque
+
+WEEK_DAYS = 7
+
+def percentile(values, pct):
+    # Nearest-rank percentile, shared by the benchmark and economy reports
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+# -------------------- DOWNSAMPLED SERIES --------------------
+class Series:
+    # Income/expense sums over equal spans of time, `width` seconds each
+    # from `origin` (the first transaction), kept in at most `capacity`
+    # buckets. Spans with no transactions get empty buckets, so bucket i
+    # always starts at origin + i * width. When a transaction lands past the
+    # last bucket, neighbouring buckets are merged pairwise and each covers
+    # twice as long from then on, so adding stays O(1) amortized and a chart
+    # of it never has more points than it has pixels.
+    def __init__(self, capacity, width=1.0):
+        self.capacity = max(2, capacity - capacity % 2)
+        self.buckets = []
+        self.origin = None
+        self.width = width
+
+    def add(self, t, income, expense):
+        if self.origin is None:
+            self.origin = t
+        index = max(0, int((t - self.origin) // self.width))  # a clock set back lands in the first bucket
+        while index >= self.capacity:
+            self.merge()
+            index = int((t - self.origin) // self.width)
+        while len(self.buckets) <= index:
+            self.buckets.append([0, 0])
+        bucket = self.buckets[index]
+        bucket[0] += income
+        bucket[1] += expense
+
+    def merge(self):
+        pairs = zip(self.buckets[::2], self.buckets[1::2] + [[0, 0]])
+        self.buckets = [[a[0] + b[0], a[1] + b[1]] for a, b in pairs]
+        self.width *= 2
+
+    def to_save(self):
+        return {"origin": self.origin, "width": self.width, "buckets": [list(b) for b in self.buckets]}
+
+    def restore(self, data):
+        self.origin = data["origin"]
+        self.width = data["width"]
+        self.buckets = [list(b) for b in data["buckets"]]
+        while len(self.buckets) > self.capacity:  # saved from a wider chart
+            self.merge()
+
+    def cumulative(self):
+        income = expense = 0
+        points = []
+        for bucket_income, bucket_expense in self.buckets:
+            income += bucket_income
+            expense += bucket_expense
+            points.append((income, expense))
+        return points
+
+# -------------------- SPENDING STATS --------------------
+def day_of(t):
+    return datetime.date.fromtimestamp(t).toordinal()
+
+class SpendingStats:
+    # Running aggregates over ledger transactions: spending per item, total
+    # income and expenses, today's and the last week's totals, and a chart
+    # series. Each transaction updates them in O(1); nothing ever rescans
+    # the history. `version` goes up on every change so views can cache.
+    # Transactions are ledger records, dated by their "t"; callers pass
+    # today's day_of() from the game's clock. Saved with the ledger snapshot
+    # (see Ledger views), so a load only replays the tail of the log.
+    def __init__(self, chart_width):
+        self.by_item = {}  # item -> [spent, bought]
+        self.income = 0
+        self.expenses = 0
+        self.days = deque()  # [day, income, expenses] for the last week
+        self.week_income = 0
+        self.week_expenses = 0
+        self.series = Series(chart_width)
+        self.version = 0
+
+    def add(self, tx):
+        amount = tx["amount"]
+        if amount == 0:
+            return
+        income = max(0, amount)
+        expense = max(0, -amount)
+
+        if tx["kind"] == "purchase":
+            entry = self.by_item.setdefault(tx["item"], [0, 0])
+            entry[0] += expense
+            entry[1] += 1
+        self.income += income
+        self.expenses += expense
+
+        day = day_of(tx["t"])
+        if not self.days or self.days[-1][0] < day:
+            self.days.append([day, 0, 0])
+            self.expire(day)
+        self.days[-1][1] += income
+        self.days[-1][2] += expense
+        self.week_income += income
+        self.week_expenses += expense
+
+        self.series.add(tx["t"], income, expense)
+        self.version += 1
+
+    def to_save(self):
+        return {
+            "by_item": {item: list(entry) for item, entry in self.by_item.items()},
+            "income": self.income,
+            "expenses": self.expenses,
+            "days": [list(day) for day in self.days],
+            "series": self.series.to_save()
+        }
+
+    def restore(self, data):
+        self.by_item = {item: list(entry) for item, entry in data["by_item"].items()}
+        self.income = data["income"]
+        self.expenses = data["expenses"]
+        self.days = deque(list(day) for day in data["days"])
+        self.week_income = sum(day[1] for day in self.days)
+        self.week_expenses = sum(day[2] for day in self.days)
+        self.series.restore(data["series"])
+        self.version += 1
+
+    def expire(self, today):
+        while self.days and self.days[0][0] <= today - WEEK_DAYS:
+            _, income, expense = self.days.popleft()
+            self.week_income -= income
+            self.week_expenses -= expense
+
+    def today(self, today):
+        if self.days and self.days[-1][0] == today:
+            return self.days[-1][1], self.days[-1][2]
+        return 0, 0
+
+    def week(self, today):
+        self.expire(today)
+        return self.week_income, self.week_expenses
@@ -0,0 +1,212 @@
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import threading
+
+import pygame
+
+# -------------------- ASSET MANAGER --------------------
+class AssetManager:
+    # Images, sounds and fonts are registered by name up front but only
+    # decoded when first used, so startup does not wait on files the first
+    # frame never shows. preload() queues assets for a background thread,
+    # lowest priority number first; get() on an asset that is not ready yet
+    # decodes it on the spot, or waits if the thread is already on it.
+    # Converting images to the display format stays on the main thread
+    # (SpriteCache), the thread only decodes. Fonts come from `fonts`, a
+    # FontCache.
+    def __init__(self, fonts):
+        self.fonts = fonts
+        self.loaders = {}
+        self.images = {}  # name -> source file, for build_assets.py
+        self.loaded = {}
+        self.decoding = {}  # name -> Event set once the decode finishes
+        self.lock = threading.Lock()
+        self.queue = []
+        self.order = itertools.count()
+        self.wake = threading.Condition(self.lock)
+        self.thread = None
+
+    def image(self, name, path):
+        path = os.path.abspath(path)
+        self.images[name] = path
+        self.loaders[name] = lambda: pygame.image.load(path)
+
+    def atlas(self, name, manifest_path):
+        # Registers the sheet of an Atlas as the image `name`
+        atlas = Atlas(name, manifest_path)
+        if atlas.image is not None:
+            path = atlas.image
+            self.loaders[name] = lambda: pygame.image.load(path)
+        return atlas
+
+    def sound(self, name, path):
+        path = os.path.abspath(path)
+        self.loaders[name] = lambda: pygame.mixer.Sound(path)
+
+    def font(self, name, family, size):
+        self.loaders[name] = lambda: self.fonts.get(family, size)
+
+    def ready(self, name):
+        return name in self.loaded
+
+    def get(self, name):
+        asset = self.loaded.get(name)
+        if asset is not None:
+            return asset
+        # Loops because a failed preload leaves the asset for us to decode
+        while name not in self.loaded:
+            with self.lock:
+                done = self.decoding.get(name)
+                mine = done is None and name not in self.loaded
+                if mine:
+                    done = self.decoding[name] = threading.Event()
+            if mine:
+                self.decode(name, done)
+            elif done is not None:
+                done.wait()
+        return self.loaded[name]
+
+    __getitem__ = get
+
+    def decode(self, name, done):
+        try:
+            self.loaded[name] = self.loaders[name]()
+        finally:
+            with self.lock:
+                del self.decoding[name]
+            done.set()
+
+    def preload(self, names, priority=1):
+        with self.lock:
+            for name in names:
+                heapq.heappush(self.queue, (priority, next(self.order), name))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="asset-preload", daemon=True)
+                self.thread.start()
+            self.wake.notify()
+
+    def run(self):
+        while True:
+            with self.lock:
+                while not self.queue:
+                    self.wake.wait()
+                name = heapq.heappop(self.queue)[2]
+                if name in self.loaded or name in self.decoding:
+                    continue
+                done = self.decoding[name] = threading.Event()
+            try:
+                self.decode(name, done)
+            except (pygame.error, OSError):
+                pass  # get() will decode it again and raise where it is used
+
+# -------------------- ATLAS --------------------
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+class Atlas:
+    # One sheet holding every image at each size the game draws it, written
+    # by build_assets.py together with a JSON manifest of where each sprite
+    # sits. The manifest also has a hash of every source image; the sprites
+    # of a source that changed since the build are ignored (and scaled from
+    # the source again) until the atlas is rebuilt. Without a manifest the
+    # atlas is simply empty.
+    FORMAT = 1
+
+    def __init__(self, name, manifest_path):
+        self.name = name
+        self.image = None
+        self.sprites = {}  # (name, (w, h)) -> Rect in the sheet
+        self.sources = {}  # name -> (source file, hash at build time)
+        self.fresh = {}  # name -> source unchanged, checked on first use
+        try:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("format") != self.FORMAT:
+            return
+        folder = os.path.dirname(os.path.abspath(manifest_path))
+        image = os.path.join(folder, manifest["image"])
+        if not os.path.exists(image):
+            return
+        self.image = image
+        for name, (path, digest) in manifest["sources"].items():
+            self.sources[name] = (os.path.abspath(path), digest)
+        for name, size, rect in manifest["sprites"]:
+            self.sprites[(name, tuple(size))] = pygame.Rect(rect)
+
+    def find(self, name, size):
+        # Where the sprite is in the sheet, or None if it is not there (or stale)
+        rect = self.sprites.get((name, tuple(size)))
+        if rect is None:
+            return None
+        fresh = self.fresh.get(name)
+        if fresh is None:
+            path, digest = self.sources[name]
+            try:
+                fresh = file_hash(path) == digest
+            except OSError:
+                fresh = True  # the sheet is all there is
+            self.fresh[name] = fresh
+        return rect if fresh else None
+
+# -------------------- SPRITE CACHE --------------------
+class SpriteCache:
+    # Images converted to the display's pixel format once, plus pre-scaled
+    # copies keyed by (name, size). Everything is rebuilt if the display
+    # mode changes, since converted surfaces are tied to the old format.
+    # `images` is anything indexable by name, such as an AssetManager.
+    # Scaled copies that are in `atlas` are cut out of its sheet instead of
+    # scaled, so the full-size source is never decoded for them.
+    def __init__(self, images, atlas=None):
+        self.images = images
+        self.atlas = atlas
+        self.converted = {}
+        self.scaled = {}
+        self.display_format = None
+
+    def check_display(self):
+        display = pygame.display.get_surface()
+        if display is None:
+            fmt = None
+        else:
+            fmt = (display.get_size(), display.get_bitsize(), display.get_masks())
+        if fmt != self.display_format:
+            self.display_format = fmt
+            self.converted.clear()
+            self.scaled.clear()
+
+    def get(self, name, size=None):
+        self.check_display()
+        if size is not None:
+            key = (name, tuple(size))
+            surf = self.scaled.get(key)
+            if surf is None:
+                rect = None if self.atlas is None else self.atlas.find(*key)
+                if rect is not None:
+                    surf = self.get(self.atlas.name).subsurface(rect)
+                else:
+                    surf = pygame.transform.scale(self.get(name), key[1])
+                self.scaled[key] = surf
+            return surf
+
+        surf = self.converted.get(name)
+        if surf is None:
+            surf = self.images[name]
+            if self.display_format is not None:
+                if surf.get_flags() & pygame.SRCALPHA:
+                    surf = surf.convert_alpha()
+                else:
+                    surf = surf.convert()
+            self.converted[name] = surf
+        return surf
+
+    def source(self, name, size=None):
+        # The image get() has to decode for this sprite, to preload it
+        if size is not None and self.atlas is not None and self.atlas.find(name, size) is not None:
+            return self.atlas.name
+        return name
@@ -0,0 +1,60 @@
+import pygame
+
+FREQUENCY = 44100
+BUFFER = 256  # samples per mixer buffer, ~6 ms at 44.1 kHz (pygame's default is 512)
+FREE_CHANNELS = 2  # left unreserved for anything played without a group
+
+def pre_init_mixer():
+    # Must run before pygame.init(), which would otherwise open the audio
+    # device with the default (larger) buffer
+    pygame.mixer.pre_init(FREQUENCY, -16, 2, BUFFER)
+
+# -------------------- AUDIO MANAGER --------------------
+class AudioManager:
+    # Plays short UI sounds on channel groups reserved for them, so a click
+    # never waits for (or gets dropped for lack of) a free channel. When
+    # every channel in a group is busy the one that started longest ago is
+    # cut off. The same sound played again within `min_gap` ms is skipped,
+    # so fast clicking does not pile up copies of it. Sounds come from
+    # `assets`; one that is not decoded yet is skipped (and queued) rather
+    # than decoded on the spot, so play() never stalls the frame.
+    def __init__(self, assets, groups, min_gap=30):
+        self.assets = assets
+        self.min_gap = min_gap
+        self.clock = pygame.time.get_ticks  # ms
+        self.last_played = {}  # sound name -> clock()
+        self.played = self.stolen = self.skipped = 0
+        reserved = sum(groups.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved + FREE_CHANNELS))
+        pygame.mixer.set_reserved(reserved)
+        # Each group's channels, least recently started first
+        self.groups = {}
+        first = 0
+        for group, count in groups.items():
+            self.groups[group] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            first += count
+
+    def play(self, group, name):
+        now = self.clock()
+        last = self.last_played.get(name)
+        if last is not None and 0 <= now - last < self.min_gap:
+            self.skipped += 1
+            return None
+        if not self.assets.ready(name):
+            self.assets.preload([name], priority=0)
+            self.skipped += 1
+            return None
+        self.last_played[name] = now
+
+        channels = self.groups[group]
+        for i, channel in enumerate(channels):
+            if not channel.get_busy():
+                break
+        else:
+            i = 0
+            self.stolen += 1
+        channel = channels.pop(i)
+        channels.append(channel)
+        channel.play(self.assets.get(name))
+        self.played += 1
+        return channel
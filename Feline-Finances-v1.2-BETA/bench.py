@@ -0,0 +1,337 @@
+# Headless frame-time benchmark covering every screen.
+#
+#   python bench.py                    run, write bench_results.json and compare
+#                                      against bench_baseline.json if there is one
+#   python bench.py --update-baseline  run and store the results as the baseline
+#
+# Also times startup (process start to first presented frame) for a new
+# player, a returning one and a shared computer with a profile picker full of
+# cats, each in a fresh interpreter in a scratch folder.
+#
+# Runs under SDL's dummy video/audio drivers, so no window is opened. Run it
+# from this folder, like main.py, so the assets are found.
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import main as game
+from analytics import SpendingStats, percentile
+from minigames import LaundryGame, StovetopGame, TrashGame
+from persistence import SaveSlots
+from simulation import Cat, Simulation
+
+RESULTS_FILE = "bench_results.json"
+BASELINE_FILE = "bench_baseline.json"
+FRAME_MS = 16
+SHELTER_SIZE = 5000
+CROWD = 400  # moving objects in the laundry and stovetop scenarios
+STARTUP_RUNS = 5
+PROFILES = 40  # save slots in the startup_profiles scenario
+
+# A metric regresses when it is worse than the baseline by more than the
+# relative tolerance AND by more than the absolute slack (to ignore noise)
+THRESHOLDS = {
+    "p50_ms": (0.25, 0.2),
+    "p95_ms": (0.25, 0.5),
+    "p99_ms": (0.35, 1.0),
+    "alloc_bytes_per_frame": (0.25, 512),
+    "text_renders_per_frame": (0.10, 0.05),
+    "text_draws_per_frame": (0.10, 0.5),
+    "first_frame_ms": (0.25, 20),
+}
+
+# -------------------- POINTER --------------------
+class Pointer:
+    # The dummy video driver has no real mouse, so the benchmark moves its
+    # own pointer and reports it through pygame.mouse.get_pos
+    def __init__(self):
+        self.pos = (0, 0)
+
+    def move(self, pos):
+        rel = (pos[0] - self.pos[0], pos[1] - self.pos[1])
+        self.pos = pos
+        return [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=rel, buttons=(0, 0, 0))]
+
+    def get_pos(self):
+        return self.pos
+
+pointer = Pointer()
+pygame.mouse.get_pos = pointer.get_pos
+
+# -------------------- BENCH PACER --------------------
+class BenchPacer:
+    # Stands in for FramePacer: never sleeps, hands out scripted events and
+    # measures the work done between two waits, which is exactly one frame
+    def __init__(self, frames, script, trace_allocs=False):
+        self.frames = frames
+        self.script = script
+        self.trace_allocs = trace_allocs
+        self.index = 0
+        self.mode = "active"
+        self.times = []
+        self.renders = []
+        self.draws = []
+        self.allocs = []
+
+    def done(self):
+        return self.index > self.frames
+
+    def wait(self, animating=False, busy=False):
+        now = time.perf_counter()
+        if 0 < self.index <= self.frames:
+            self.times.append((now - self.start) * 1000)
+            self.renders.append(game.text_cache.misses - self.misses)
+            self.draws.append(game.text_cache.hits + game.text_cache.misses - self.hits - self.misses)
+            if self.trace_allocs:
+                self.allocs.append(tracemalloc.get_traced_memory()[1] - self.traced)
+
+        events = self.script(self.index)
+        self.index += 1
+
+        self.hits = game.text_cache.hits
+        self.misses = game.text_cache.misses
+        if self.trace_allocs:
+            tracemalloc.reset_peak()
+            self.traced = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return FRAME_MS, events
+
+    def pause(self, ms):
+        pass
+
+# Frames run back to back here, so the sound rate limit has to go by frames
+# rather than the wall clock or it would skip nearly every sound
+game.sounds.clock = lambda: game.pacer.index * FRAME_MS
+
+# -------------------- SCENARIOS --------------------
+def key(k, unicode=""):
+    return pygame.event.Event(pygame.KEYDOWN, key=k, unicode=unicode, mod=0, scancode=0)
+
+def new_game():
+    game.sim = Simulation(Cat("Bench", "Orange", "Playful"))
+    game.spending = SpendingStats(game.CHART_RECT.width)
+    # No ledger here to date the transactions, so stamp them the way it would
+    game.sim.listeners.append(lambda tx: game.spending.add(dict(tx, t=game.clock())))
+    # Some history for the finances chart
+    for i in range(200):
+        game.sim.complete_chore("trash")
+        game.sim.buy(random.choice(list(game.sim.prices)))
+    game.in_store = game.in_chore = game.in_finances = False
+    game.active_minigame = None
+    game.store_message_timer = 0
+    game.dirty.invalidate()
+
+def run_setup(frames, trace_allocs):
+    def script(i):
+        if i == 0:
+            return [key(pygame.K_b, "B")]
+        if i <= 3:
+            return [key(pygame.K_DOWN)]
+        if i == frames:
+            return [key(pygame.K_RETURN, "\r")]
+        return []
+    pacer = game.pacer = BenchPacer(frames, script, trace_allocs)
+    game.setup_screen()
+    return pacer
+
+def run_loop(frames, trace_allocs, prepare, path, extra=None):
+    new_game()
+    prepare()
+    def script(i):
+        events = pointer.move(path(i))
+        if extra:
+            events += extra(i)
+        return events
+    pacer = game.pacer = BenchPacer(frames, script, trace_allocs)
+    while not pacer.done():
+        dt, events = pacer.wait()
+        game.run_frame(dt, events)
+    return pacer
+
+def store_item(i):
+    return (game.OVERLAY_X + 100, game.OVERLAY_Y + 105 + i * 70)
+
+def chore_row(i):
+    return (game.OVERLAY_X + 100, game.OVERLAY_Y + 130 + i * 80)
+
+def open_store():
+    game.in_store = True
+
+def click_items(i):
+    # A click every fourth frame, spread over the items: sounds and, once
+    # the money runs out, the error sound and message
+    if i % 4:
+        return []
+    return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=store_item((i // 4) % 3), button=1)]
+
+def open_chores():
+    game.in_chore = True
+
+def open_trash():
+    game.in_chore = True
+    game.active_minigame = TrashGame(game.PLAY_AREA, random.Random(0))
+
+def open_laundry():
+    # A crowded room; the clicks land on nothing, so nobody gets put away
+    game.in_chore = True
+    game.active_minigame = LaundryGame(game.PLAY_AREA, random.Random(0), count=CROWD)
+
+def open_stovetop():
+    # Enough grease to keep about CROWD drops in the air, and no end to it
+    game.in_chore = True
+    game.active_minigame = StovetopGame(game.PLAY_AREA, random.Random(0), rate=CROWD // 1.5, goal=10 ** 9, capacity=2 * CROWD)
+
+def sweep(i):
+    # Back and forth across the play area
+    area = game.PLAY_AREA
+    offset = (i * 9) % (2 * area.width)
+    return (area.left + min(offset, 2 * area.width - offset - 1), area.centery)
+
+def open_finances():
+    game.in_finances = True
+
+def fill_shelter():
+    for i in range(SHELTER_SIZE):
+        game.sim.adopt(Cat(f"Stray {i}", "Grey", "Shy"))
+
+SCENARIOS = {
+    # Pointer moves between a button and empty space; stats decay now and then
+    "main": lambda n, t: run_loop(n, t, lambda: None,
+                                  lambda i: (100, 520) if (i // 15) % 2 else (500, 350),
+                                  lambda i: [pygame.event.Event(game.DECAY_EVENT)] if i % 120 == 0 else []),
+    "whiskermart": lambda n, t: run_loop(n, t, open_store, lambda i: store_item((i // 20) % 3)),
+    "shopping": lambda n, t: run_loop(n, t, open_store, lambda i: store_item((i // 4) % 3), click_items),
+    "taskboard": lambda n, t: run_loop(n, t, open_chores, lambda i: chore_row((i // 20) % 3)),
+    "trash": lambda n, t: run_loop(n, t, open_trash, lambda i: (200 + (i * 7) % 500, 200 + (i * 3) % 250)),
+    "finances": lambda n, t: run_loop(n, t, open_finances, lambda i: (450, 300)),
+    "laundry": lambda n, t: run_loop(n, t, open_laundry, sweep),
+    "stovetop": lambda n, t: run_loop(n, t, open_stovetop, sweep),
+    # Main view with a shelter-sized household decaying every 10 frames
+    "shelter": lambda n, t: run_loop(n, t, fill_shelter, lambda i: (500, 350),
+                                     lambda i: [pygame.event.Event(game.DECAY_EVENT)] if i % 10 == 0 else []),
+}
+
+# -------------------- STARTUP --------------------
+def first_frame_ms(folder):
+    # A fresh interpreter each time, so imports and asset loading count too
+    result = subprocess.run([sys.executable, os.path.abspath("main.py"), "--startup-time"],
+                            cwd=folder, capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[-2])
+
+def run_startup(cats):
+    with tempfile.TemporaryDirectory(prefix="feline-bench-") as folder:
+        shutil.copytree("assets", os.path.join(folder, "assets"))
+        slots = SaveSlots(os.path.join(folder, game.SAVES_DIR), game.SAVE_FILE)
+        for i in range(cats):
+            slot = slots.create()
+            data = Simulation(Cat(f"Bench {i}", game.CAT_TYPES[i % len(game.CAT_TYPES)], "Playful")).to_save()
+            data["saved_at"] = time.time() - i * 3600
+            with open(slots.path(slot, game.SAVE_FILE), "w") as f:
+                json.dump(data, f)
+            slots.record(slot, data)
+        times = [first_frame_ms(folder) for _ in range(STARTUP_RUNS)]
+    return {"runs": len(times), "first_frame_ms": round(percentile(times, 50), 1)}
+
+STARTUPS = {
+    "startup_new": lambda: run_startup(0),  # setup screen
+    "startup_returning": lambda: run_startup(1),  # profile picker
+    "startup_profiles": lambda: run_startup(PROFILES),  # profile picker, scrolled list
+}
+
+# -------------------- REPORTING --------------------
+def mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+def measure(run, frames):
+    timed = run(frames, False)
+    tracemalloc.start()
+    try:
+        traced = run(frames, True)
+    finally:
+        tracemalloc.stop()
+    return {
+        "frames": len(timed.times),
+        "p50_ms": round(percentile(timed.times, 50), 4),
+        "p95_ms": round(percentile(timed.times, 95), 4),
+        "p99_ms": round(percentile(timed.times, 99), 4),
+        "mean_ms": round(mean(timed.times), 4),
+        "alloc_bytes_per_frame": round(mean(traced.allocs), 1),
+        "text_renders_per_frame": round(mean(timed.renders), 3),
+        "text_draws_per_frame": round(mean(timed.draws), 3),
+    }
+
+def compare(results, baseline):
+    regressions = []
+    for name, metrics in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        for metric, (rel, slack) in THRESHOLDS.items():
+            if metric not in base:
+                continue
+            old, new = base[metric], metrics[metric]
+            if new > old * (1 + rel) and new - old > slack:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark")
+    parser.add_argument("--frames", type=int, default=300, help="frames per screen")
+    parser.add_argument("--only", nargs="*", help="screens to run (default: all)")
+    parser.add_argument("--update-baseline", action="store_true", help="store results as the new baseline")
+    args = parser.parse_args()
+
+    random.seed(0)
+    runs = {"setup": run_setup}
+    runs.update(SCENARIOS)
+    results = {
+        "python": sys.version.split()[0],
+        "pygame": pygame.version.ver,
+        "frames": args.frames,
+        "scenarios": {}
+    }
+    for name, run in runs.items():
+        if args.only and name not in args.only:
+            continue
+        metrics = results["scenarios"][name] = measure(run, args.frames)
+        print(f"{name:12} p50 {metrics['p50_ms']:7.3f} ms  p95 {metrics['p95_ms']:7.3f} ms  "
+              f"p99 {metrics['p99_ms']:7.3f} ms  alloc {metrics['alloc_bytes_per_frame']:9.1f} B  "
+              f"text {metrics['text_renders_per_frame']:.3f}/{metrics['text_draws_per_frame']:.3f}")
+    for name, run in STARTUPS.items():
+        if args.only and name not in args.only:
+            continue
+        metrics = results["scenarios"][name] = run()
+        print(f"{name:18} first frame {metrics['first_frame_ms']:7.1f} ms  (median of {metrics['runs']})")
+
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=4)
+
+    if args.update_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print(f"No {BASELINE_FILE} yet, run with --update-baseline to create one")
+        return 0
+    with open(BASELINE_FILE) as f:
+        regressions = compare(results, json.load(f))
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION {name} {metric}: {old} -> {new}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
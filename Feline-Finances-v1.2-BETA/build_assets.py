@@ -0,0 +1,105 @@
+# Asset build step: scales every image to each size the game draws it at
+# (main.SPRITE_SIZES) and packs the results into one sheet, plus a manifest
+# saying where each sprite is (see assets.Atlas). The game then decodes one
+# small sheet instead of the full-size sources and never scales at runtime.
+#
+#   python build_assets.py           write assets/build/atlas.png and atlas.json
+#   python build_assets.py --check   exit non-zero if the atlas is missing or out of date
+#
+# Run it again after changing an image or a size; until then the game scales
+# the changed sprites from their sources. Runs under SDL's dummy video/audio
+# drivers, from this folder like main.py.
+import argparse
+import json
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import main as game
+from assets import Atlas, file_hash
+
+SHEET_WIDTH = 512
+PADDING = 2  # px of transparency between sprites
+
+# -------------------- PACKING --------------------
+def pack(sprites):
+    # Shelf packing, tallest first: sprites go left to right and a new shelf
+    # starts below when a row is full. `sprites` is a list of (key, size);
+    # returns {key: Rect} and the sheet size.
+    rects = {}
+    x = y = shelf = 0
+    for key, (w, h) in sorted(sprites, key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        if x + w > SHEET_WIDTH:
+            x, y, shelf = 0, y + shelf + PADDING, 0
+        rects[key] = pygame.Rect(x, y, w, h)
+        x += w + PADDING
+        shelf = max(shelf, h)
+    width = max(rect.right for rect in rects.values())
+    return rects, (width, y + shelf)
+
+def wanted():
+    return [((name, tuple(size)), tuple(size)) for name, sizes in game.SPRITE_SIZES.items() for size in sizes]
+
+# -------------------- BUILD --------------------
+def build(manifest_path):
+    rects, sheet_size = pack(wanted())
+    sheet = pygame.Surface(sheet_size, pygame.SRCALPHA)
+    sheet.fill((0, 0, 0, 0))
+    images = {}
+    sources = {}
+    for (name, size), rect in sorted(rects.items()):
+        path = game.assets.images[name]
+        if name not in images:
+            images[name] = pygame.image.load(path).convert_alpha()
+            sources[name] = [os.path.relpath(path).replace(os.sep, "/"), file_hash(path)]
+        # Offline, so the slower but smoother filter is free
+        sheet.blit(pygame.transform.smoothscale(images[name], size), rect)
+
+    folder = os.path.dirname(manifest_path)
+    os.makedirs(folder, exist_ok=True)
+    image_name = os.path.splitext(os.path.basename(manifest_path))[0] + ".png"
+    pygame.image.save(sheet, os.path.join(folder, image_name))
+    manifest = {
+        "format": Atlas.FORMAT,
+        "image": image_name,
+        "sources": sources,
+        "sprites": [[name, list(size), list(rect)] for (name, size), rect in sorted(rects.items())]
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    return sheet_size, len(rects)
+
+def stale(manifest_path):
+    # Sprites the game wants that the atlas does not have (or has from an
+    # older version of the source)
+    atlas = Atlas("atlas", manifest_path)
+    if atlas.image is None:
+        return [key for key, _ in wanted()]
+    return [key for key, _ in wanted() if atlas.find(*key) is None]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sprite atlas")
+    parser.add_argument("--check", action="store_true", help="only check that the atlas is up to date")
+    args = parser.parse_args()
+
+    manifest_path = game.ATLAS_MANIFEST
+    if args.check:
+        missing = stale(manifest_path)
+        for name, size in missing:
+            print(f"Out of date: {name} at {size[0]}x{size[1]}")
+        if not missing:
+            print(f"{manifest_path} is up to date")
+        return 1 if missing else 0
+
+    (width, height), count = build(manifest_path)
+    print(f"Packed {count} sprites into a {width}x{height} sheet, wrote {manifest_path}")
+    return 0
+
+if __name__ == "__main__":
+    status = main()
+    pygame.quit()
+    sys.exit(status)
@@ -0,0 +1,290 @@
+# Monte Carlo balance simulator: plays thousands of scripted sessions against
+# the real Simulation and reports how money and health turn out.
+#
+#   python economy.py                                   current balance
+#   python economy.py --sweep Meowmunch=3,5,7 --sweep trash=4,5,6
+#   python economy.py --sweep hunger=1,2,3 --csv sweep.csv
+#
+# A sweep name is a store item (price), a chore (payout) or a stat (decay per
+# tick, fractions allowed: hunger=1.5,2); every combination of the given
+# values is simulated. Runs are spread over a process pool on all cores.
+# Needs no pygame.
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from analytics import percentile
+from simulation import CHORE_PAYOUTS, DECAYING_STATS, DECAY_RATES, STORE_PRICES, TICK_MS, Cat, Simulation
+
+TICKS_PER_MINUTE = 60000 // TICK_MS
+SICK_BELOW = 40  # health where get_mood() turns "Sick"
+BATCH_SIZE = 50  # sessions per pool task
+
+# Care action and item for each stat that decays (energy just needs rest)
+NEEDS = [("hunger", "Meowmunch", "feed"), ("happiness", "Purrplay", "play"), ("cleanliness", "Furbath", "clean")]
+
+# -------------------- PLAYER STRATEGIES --------------------
+# Each strategy gets the simulation at a check-in, does its thing and returns
+# how many ticks that took (chores take time, care actions are instant).
+# `habits` is drawn per session so a batch covers a spread of players.
+def work(sim, chores):
+    sim.complete_chore("trash")
+    return chores + 1
+
+def caretaker(sim, rng, habits):
+    # Tops up every need below the threshold, buying what is missing and
+    # working chores when it cannot afford it
+    chores = 0
+    for stat, item, action in NEEDS:
+        if getattr(sim.cat, stat) < habits["threshold"]:
+            while not sim.inventory.get(item) and not sim.can_afford(item) and chores < habits["max_chores"]:
+                chores = work(sim, chores)
+            if sim.inventory.get(item) or sim.buy(item):
+                getattr(sim, action)()
+    if sim.cat.energy < habits["threshold"]:
+        sim.rest()
+    return chores * habits["chore_ticks"]
+
+def saver(sim, rng, habits):
+    # Works every check-in and only ever pays for food
+    chores = 0
+    while chores < habits["max_chores"]:
+        chores = work(sim, chores)
+    if sim.cat.hunger < habits["threshold"] and (sim.inventory.get("Meowmunch") or sim.buy("Meowmunch")):
+        sim.feed()
+    if sim.cat.energy < habits["threshold"]:
+        sim.rest()
+    return chores * habits["chore_ticks"]
+
+def stockpiler(sim, rng, habits):
+    # Uses items from stock when a need runs low and keeps a few of each
+    # item in reserve, working for whatever it cannot afford
+    chores = 0
+    for stat, item, action in NEEDS:
+        if getattr(sim.cat, stat) < habits["threshold"]:
+            getattr(sim, action)()
+    for stat, item, action in NEEDS:
+        while sim.inventory.get(item, 0) < habits["stock"]:
+            if sim.buy(item):
+                continue
+            if chores >= habits["max_chores"]:
+                break
+            chores = work(sim, chores)
+    if sim.cat.energy < habits["threshold"]:
+        sim.rest()
+    return chores * habits["chore_ticks"]
+
+def clicker(sim, rng, habits):
+    # Presses random buttons
+    chores = 0
+    for _ in range(habits["max_chores"]):
+        choice = rng.randrange(6)
+        if choice < 3:
+            stat, item, action = NEEDS[choice]
+            if not getattr(sim, action)():
+                sim.buy(item)
+        elif choice == 3:
+            sim.rest()
+        else:
+            chores = work(sim, chores)
+    return chores * habits["chore_ticks"]
+
+# Strategy, then ranges the per-session habits are drawn from: ticks
+# between check-ins, need threshold, chores per check-in, items kept in stock
+STRATEGIES = {
+    "caretaker": (caretaker, {"check_every": (1, 12), "threshold": (50, 80), "max_chores": (2, 6), "stock": (0, 0)}),
+    "casual": (caretaker, {"check_every": (60, 360), "threshold": (40, 70), "max_chores": (4, 12), "stock": (0, 0)}),
+    "saver": (saver, {"check_every": (6, 60), "threshold": (20, 40), "max_chores": (2, 8), "stock": (0, 0)}),
+    "stockpiler": (stockpiler, {"check_every": (12, 120), "threshold": (50, 80), "max_chores": (4, 10), "stock": (1, 4)}),
+    "clicker": (clicker, {"check_every": (1, 24), "threshold": (0, 0), "max_chores": (1, 6), "stock": (0, 0)}),
+}
+
+# -------------------- SESSION --------------------
+# `values` and `rates` below are the decaying stats of a cat and their decay
+# per tick, in DECAYING_STATS order
+def health_after(values, rates, ticks):
+    # Health after `ticks` more ticks of decay
+    total = 0
+    for value, rate in zip(values, rates):
+        total += max(0, value - rate * ticks)
+    return total / 4
+
+def health_sum(values, rates, ticks):
+    # Sum of health over the next `ticks` ticks, in closed form: each stat
+    # falls as an arithmetic series until it hits 0
+    total = 0
+    for value, rate in zip(values, rates):
+        if rate <= 0:
+            total += value * ticks
+            continue
+        steps = min(ticks, int(value // rate))
+        total += steps * value - rate * steps * (steps + 1) / 2
+    return total / 4
+
+def run_session(config, strategy, seed, ticks):
+    # One scripted session; returns (money, spent, chores, final health,
+    # mean health, lowest health, tick the cat first got sick or None)
+    rng = random.Random(seed)
+    sim = Simulation(Cat("Sim", "Orange", "Playful"))
+    sim.prices.update(config["prices"])
+    sim.payouts.update(config["payouts"])
+    sim.decay_rates.update(config["decay_rates"])
+    earned = []
+    sim.listeners.append(lambda tx: tx["kind"] == "chore" and earned.append(tx["amount"]))
+
+    act, ranges = STRATEGIES[strategy]
+    habits = {name: rng.randint(low, high) for name, (low, high) in ranges.items()}
+    habits["chore_ticks"] = rng.randint(1, 3)  # a trash run takes 5-15 s
+
+    rates = [sim.decay_rates[stat] for stat in DECAYING_STATS]
+    cat = sim.cat
+    tick = 0
+    total_health = 0
+    lowest = sim.cat.health
+    sick_at = None
+    while tick < ticks:
+        busy = act(sim, rng, habits)
+        wait = min(ticks - tick, busy + rng.randint(1, habits["check_every"]))
+
+        # Health only falls between check-ins, so the lowest point is at the
+        # end of the wait and the first sick tick can be bisected
+        values = cat.household.decaying_stats(cat.row)
+        total_health += health_sum(values, rates, wait)
+        if sick_at is None and health_after(values, rates, wait) < SICK_BELOW:
+            low, high = 1, wait
+            while low < high:
+                mid = (low + high) // 2
+                if health_after(values, rates, mid) < SICK_BELOW:
+                    high = mid
+                else:
+                    low = mid + 1
+            sick_at = tick + low
+        sim.catch_up(wait * TICK_MS)
+        lowest = min(lowest, cat.health)
+        tick += wait
+
+    return (sim.money, sim.total_spent, len(earned), sim.cat.health, total_health / ticks, lowest, sick_at)
+
+def run_batch(task):
+    config, strategy, seeds, ticks = task
+    return [run_session(config, strategy, seed, ticks) for seed in seeds]
+
+# -------------------- SWEEP --------------------
+def parse_sweeps(specs, parser):
+    # "Meowmunch=3,5,7" -> ("prices", "Meowmunch", [3, 5, 7]). Money stays
+    # in whole dollars; decay rates are floats like the household's stats
+    sweeps = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name in STORE_PRICES:
+            knob, kind = "prices", int
+        elif name in CHORE_PAYOUTS:
+            knob, kind = "payouts", int
+        elif name in DECAY_RATES:
+            knob, kind = "decay_rates", float
+        else:
+            parser.error(f"unknown sweep name {name!r}, expected an item, chore or stat")
+        try:
+            sweeps.append((knob, name, [kind(v) for v in values.split(",")]))
+        except ValueError:
+            expected = "whole numbers" if kind is int else "numbers"
+            parser.error(f"sweep values for {name} must be {expected}: {spec!r}")
+    return sweeps
+
+def configs(sweeps):
+    # Every combination of the swept values on top of the current balance
+    for values in itertools.product(*(values for _, _, values in sweeps)):
+        config = {"prices": dict(STORE_PRICES), "payouts": dict(CHORE_PAYOUTS), "decay_rates": dict(DECAY_RATES)}
+        label = []
+        for (knob, name, _), value in zip(sweeps, values):
+            config[knob][name] = value
+            label.append(f"{name}={value:g}")
+        yield " ".join(label) or "current", config
+
+# -------------------- REPORTING --------------------
+def summarize(results):
+    money = [r[0] for r in results]
+    final = [r[3] for r in results]
+    mean = [r[4] for r in results]
+    sick = [r[6] / TICKS_PER_MINUTE for r in results if r[6] is not None]
+    return {
+        "runs": len(results),
+        "money_p5": percentile(money, 5),
+        "money_p50": percentile(money, 50),
+        "money_p95": percentile(money, 95),
+        "spent_p50": percentile([r[1] for r in results], 50),
+        "chores_p50": percentile([r[2] for r in results], 50),
+        "health_p5": round(percentile(final, 5), 1),
+        "health_p50": round(percentile(final, 50), 1),
+        "health_p95": round(percentile(final, 95), 1),
+        "mean_health_p50": round(percentile(mean, 50), 1),
+        "lowest_health_p5": round(percentile([r[5] for r in results], 5), 1),
+        "sick_pct": round(100 * len(sick) / len(results), 1),
+        "sick_after_min_p5": round(percentile(sick, 5), 1) if sick else "",
+        "sick_after_min_p50": round(percentile(sick, 50), 1) if sick else "",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo economy simulator")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME=V1,V2", help="values to try for an item price, chore payout or stat decay rate")
+    parser.add_argument("--runs", type=int, default=500, help="sessions per strategy and configuration")
+    parser.add_argument("--minutes", type=int, default=120, help="length of each session in game minutes")
+    parser.add_argument("--strategies", nargs="*", choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--seed", type=int, default=0, help="base seed, the same sessions are replayed for every configuration")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (1 runs in this process)")
+    parser.add_argument("--csv", metavar="FILE", help="also write the summary rows to a CSV file")
+    args = parser.parse_args()
+
+    sweeps = parse_sweeps(args.sweep, parser)
+    ticks = args.minutes * TICKS_PER_MINUTE
+    # Every configuration sees the same seeds, so differences between rows
+    # come from the balance and not from luck
+    seeds = [args.seed * 1000003 + i for i in range(args.runs)]
+    batches = [seeds[i:i + BATCH_SIZE] for i in range(0, len(seeds), BATCH_SIZE)]
+
+    keys, tasks = [], []
+    for label, config in configs(sweeps):
+        for strategy in args.strategies:
+            for batch in batches:
+                keys.append((label, strategy))
+                tasks.append((config, strategy, batch, ticks))
+
+    start = time.perf_counter()
+    results = {}
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            outputs = pool.map(run_batch, tasks)
+            for key, output in zip(keys, outputs):
+                results.setdefault(key, []).extend(output)
+    else:
+        for key, task in zip(keys, tasks):
+            results.setdefault(key, []).extend(run_batch(task))
+    elapsed = time.perf_counter() - start
+
+    rows = []
+    print(f"{'configuration':28} {'strategy':11} {'money p5/p50/p95':>17} {'health p5/p50/p95':>18} {'mean':>5} {'sick%':>6} {'sick after':>10}")
+    for (label, strategy), runs in results.items():
+        summary = summarize(runs)
+        rows.append(dict({"configuration": label, "strategy": strategy}, **summary))
+        money = f"{summary['money_p5']}/{summary['money_p50']}/{summary['money_p95']}"
+        health = f"{summary['health_p5']:.0f}/{summary['health_p50']:.0f}/{summary['health_p95']:.0f}"
+        sick_after = f"{summary['sick_after_min_p50']} min" if summary["sick_after_min_p50"] != "" else "-"
+        print(f"{label:28} {strategy:11} {money:>17} {health:>18} {summary['mean_health_p50']:5.0f} {summary['sick_pct']:6.1f} {sick_after:>10}")
+
+    sessions = sum(len(runs) for runs in results.values())
+    print(f"{sessions} sessions of {args.minutes} min in {elapsed:.2f} s on {args.workers} worker(s)")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import json
+import os
+import sys
+import threading
+
+import pygame
+
+FORMAT = 1
+BUNDLED_DIR = os.path.join("assets", "fonts")
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+def simple_name(family):
+    # Same normalisation pygame uses for system font names: "Comic Sans MS"
+    # and "comicsansms" are the same font
+    return "".join(c for c in family.lower() if c.isalnum())
+
+def system_font_dirs():
+    # Where each platform keeps the fonts pygame's scan would find
+    if sys.platform == "win32":
+        return [
+            os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+            os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts")
+        ]
+    if sys.platform == "darwin":
+        return ["/Library/Fonts", "/System/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+    return [
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.expanduser("~/.fonts"),
+        os.path.expanduser("~/.local/share/fonts")
+    ]
+
+def dir_stamp(path):
+    # Modification times of a folder and the folders directly inside it,
+    # which change when fonts are installed or removed
+    stamp = {}
+    try:
+        stamp[path] = os.stat(path).st_mtime_ns
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stamp[entry.path] = entry.stat().st_mtime_ns
+    except OSError:
+        pass
+    return stamp
+
+# -------------------- FONT CACHE --------------------
+class FontCache:
+    # Resolves font family names to files once and remembers the answers in
+    # a small JSON file, so later launches skip pygame's system font scan
+    # (fc-list on Linux, the registry on Windows). A font file bundled under
+    # assets/fonts, named after the family ("ComicSansMS.ttf"), wins over an
+    # installed one. The remembered answers are thrown away when pygame, the
+    # bundled fonts or the system font folders change; deleting the file
+    # forces a fresh scan too. A family that cannot be found resolves to
+    # pygame's default font, like SysFont does.
+    # Font objects are shared by (file, size).
+    def __init__(self, path, bundled=BUNDLED_DIR):
+        self.path = os.path.abspath(path)
+        self.bundled = os.path.abspath(bundled)
+        self.fonts = {}
+        self.lock = threading.Lock()
+        self.stamp = self.current_stamp()
+        self.files = self.load()  # simple name -> font file, or None for the default
+
+    def current_stamp(self):
+        dirs = {}
+        for path in [self.bundled] + system_font_dirs():
+            dirs.update(dir_stamp(path))
+        return {"format": FORMAT, "pygame": pygame.version.ver, "platform": sys.platform, "dirs": dirs}
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("stamp") != self.stamp:
+            return {}
+        return data.get("files", {})
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"stamp": self.stamp, "files": self.files}, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # only costs a scan next launch
+
+    def bundled_file(self, name):
+        try:
+            entries = os.listdir(self.bundled)
+        except OSError:
+            return None
+        for entry in sorted(entries):
+            stem, ext = os.path.splitext(entry)
+            if ext.lower() in FONT_EXTENSIONS and simple_name(stem) == name:
+                return os.path.abspath(os.path.join(self.bundled, entry))
+        return None
+
+    def resolve(self, family):
+        name = simple_name(family)
+        with self.lock:
+            if name in self.files:
+                path = self.files[name]
+                if path is None or os.path.exists(path):
+                    return path
+            path = self.bundled_file(name)
+            if path is None:
+                path = pygame.font.match_font(family)
+            self.files[name] = path
+            self.save()
+            return path
+
+    def get(self, family, size):
+        path = self.resolve(family)
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(path, size)
+        return font
@@ -0,0 +1,169 @@
+import json
+import os
+import time
+
+from persistence import SaveWriter, load_save
+
+SNAPSHOT_EVERY = 50  # transactions between snapshots
+
+# -------------------- TRANSACTIONS --------------------
+def apply_transaction(state, tx):
+    # Replays one ledger record onto a {money, total_spent, inventory} state
+    state["money"] += tx["amount"]
+    item = tx["item"]
+    if tx["kind"] == "purchase":
+        state["total_spent"] -= tx["amount"]
+        state["inventory"][item] = state["inventory"].get(item, 0) + 1
+    elif tx["kind"] == "use":
+        state["inventory"][item] = state["inventory"].get(item, 0) - 1
+
+def complete_end(path, size, chunk=65536):
+    # Offset just past the last complete (newline-terminated) record
+    if size == 0:
+        return 0
+    with open(path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - chunk)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+# -------------------- LEDGER --------------------
+class Ledger:
+    # Append-only history of every purchase, chore payout and item use, one
+    # JSON record per line. A snapshot of the money/inventory state plus the
+    # byte offset it covers is written every SNAPSHOT_EVERY records, so
+    # loading only replays the tail after the snapshot. The log itself is
+    # never rewritten and stays queryable through history(). Records are
+    # stamped with clock().
+    #
+    # `views` are running aggregates over the records ({name: view}, each
+    # with add(record), to_save() and restore(data)). They are kept up to
+    # date on every append and saved in the snapshot alongside the state, so
+    # they come back from the same tail replay. A snapshot from before a
+    # view existed has it rebuilt from the whole log once.
+    def __init__(self, path, snapshot_path, snapshot_every=SNAPSHOT_EVERY, clock=time.time, views=None):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.clock = clock
+        self.views = views or {}
+        self.snapshots = SaveWriter(snapshot_path)
+        self.state = None
+        self.seq = 0
+        self.since_snapshot = 0
+        self.file = None
+
+    def load(self):
+        # Returns the current state, or None if there is no ledger yet
+        snapshot = load_save(self.snapshot_path)
+        if snapshot is None:
+            return None
+        self.state = {
+            "money": snapshot["money"],
+            "total_spent": snapshot["total_spent"],
+            "inventory": snapshot["inventory"]
+        }
+        self.seq = snapshot["seq"]
+        self.since_snapshot = 0
+
+        offset = snapshot["offset"]
+        saved = snapshot.get("views", {})
+        stale = []
+        for name, view in self.views.items():
+            if name in saved:
+                view.restore(saved[name])
+            else:
+                stale.append(view)
+        if stale:
+            for tx in self.history(end=offset):
+                for view in stale:
+                    view.add(tx)
+
+        exists = os.path.exists(self.path)
+        size = os.path.getsize(self.path) if exists else 0
+        if not exists or size < offset:
+            # The log lost records the snapshot already covers (or went
+            # missing): keep what is left of it, minus a torn last line, and
+            # carry on from the snapshot alone
+            end = complete_end(self.path, size)
+            if end < size:
+                os.truncate(self.path, end)
+            self.file = open(self.path, "ab")
+            self.snapshot()
+            return self.state
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write from a crash, drop it
+                tx = json.loads(line)
+                apply_transaction(self.state, tx)
+                for view in self.views.values():
+                    view.add(tx)
+                self.seq = tx["seq"]
+                self.since_snapshot += 1
+                offset += len(line)
+
+        # Cut the torn tail before opening, so the append position (and the
+        # offset the next snapshot records) is the real end of the log
+        if offset < size:
+            os.truncate(self.path, offset)
+        self.file = open(self.path, "ab")
+        return self.state
+
+    def start(self, money, total_spent, inventory):
+        # Opens a fresh set of books with the given balance
+        self.state = {"money": money, "total_spent": total_spent, "inventory": dict(inventory)}
+        self.seq = 0
+        if self.file:
+            self.file.close()
+        self.file = open(self.path, "wb")
+        self.snapshot()
+
+    def append(self, tx):
+        self.seq += 1
+        record = dict(tx, seq=self.seq, t=round(self.clock(), 3))
+        self.file.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        self.file.flush()
+        apply_transaction(self.state, record)
+        for view in self.views.values():
+            view.add(record)
+
+        self.since_snapshot += 1
+        if self.since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        data = dict(self.state, inventory=dict(self.state["inventory"]))
+        data["seq"] = self.seq
+        data["offset"] = self.file.tell()
+        data["views"] = {name: view.to_save() for name, view in self.views.items()}
+        self.snapshots.save(data)
+        self.since_snapshot = 0
+
+    def history(self, kind=None, end=None):
+        # Records in order, up to byte offset `end` if given
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                offset += len(line)
+                if not line.endswith(b"\n") or (end is not None and offset > end):
+                    break
+                tx = json.loads(line)
+                if kind is None or tx["kind"] == kind:
+                    yield tx
+
+    def close(self):
+        if self.file:
+            self.snapshot()
+            self.file.close()
+            self.file = None
+        self.snapshots.close()
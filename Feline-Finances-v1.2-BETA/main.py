@@ -1,34 +1,79 @@
-import json
+import time
+STARTED = time.perf_counter()  # time-to-first-frame is measured from here
+
+import argparse
 import os
 import pygame
 import sys
 import random
 
+from analytics import SpendingStats, day_of
+from assets import AssetManager, SpriteCache
+from audio import AudioManager, pre_init_mixer
+from fonts import FontCache
+from ledger import Ledger
+from minigames import MINIGAMES
+from pacing import FramePacer
+from persistence import SaveSlots, SaveWriter, load_save
+from profiler import Profiler
+from recording import Recorder
+from rendering import DirtyRegions, Layer, TextCache
+from simulation import STORE_PRICES, TICK_MS, Cat, Simulation, get_mood
+from widgets import Widget, WidgetTree
+
+pre_init_mixer()  # small output buffer for low click latency, see audio.py
 pygame.init()
 pygame.mixer.init()
 
-# -------------------- SOUNDS --------------------
-click_sounds = [pygame.mixer.Sound(f"assets/sounds/click_00{i}.ogg") for i in range(1, 6)]
-error_sound = pygame.mixer.Sound("assets/sounds/error_005.ogg")
+# -------------------- ASSETS --------------------
+# Only registered here; each one is decoded on first use or by the preload
+# thread, whichever comes first
+fonts = FontCache("font_cache.json")
+assets = AssetManager(fonts)
 
-# -------------------- CAT IMAGES --------------------
-cat_images = {
-    "Orange": pygame.image.load("assets/cats/orange.png"),
-    "Grey": pygame.image.load("assets/cats/grey.png"),
-    "White": pygame.image.load("assets/cats/white.png"),
-    "Calico": pygame.image.load("assets/cats/calico.png")
-}
+CLICK_SOUNDS = [f"click_{i}" for i in range(1, 6)]
+for i, name in enumerate(CLICK_SOUNDS, 1):
+    assets.sound(name, f"assets/sounds/click_00{i}.ogg")
+assets.sound("error", "assets/sounds/error_005.ogg")
+
+CAT_TYPES = ["Orange", "Grey", "White", "Calico"]
+for cat_type in CAT_TYPES:
+    assets.image(cat_type, f"assets/cats/{cat_type.lower()}.png")
+
+assets.image("icon", "assets/ui/icon.png")
+assets.font("hud", "Consolas", 14)
+
+# Every size an image is drawn at. build_assets.py packs exactly these into
+# the atlas; a sprite missing from it is scaled from its source instead
+PREVIEW_SIZE = (150, 150)  # setup screen
+CAT_THUMBNAIL_SIZE = (80, 80)  # profile picker, for slots without a thumbnail
+ICON_SIZE = (58, 64)  # the source's aspect ratio
+SPRITE_SIZES = {cat_type: [PREVIEW_SIZE, CAT_THUMBNAIL_SIZE] for cat_type in CAT_TYPES}
+SPRITE_SIZES["icon"] = [ICON_SIZE]
+ATLAS_MANIFEST = "assets/build/atlas.json"
+sprites = SpriteCache(assets, assets.atlas("atlas", ATLAS_MANIFEST))
+
+# Clicks and errors get channels of their own
+sounds = AudioManager(assets, {"click": 4, "error": 2})
+
+def play_click():
+    sounds.play("click", rng.choice(CLICK_SOUNDS))
 
 # -------------------- WINDOW --------------------
 WIDTH, HEIGHT = 900, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Feline Finances")
-icon = pygame.image.load("assets/ui/icon.png")
-pygame.display.set_icon(icon)
 
-clock = pygame.time.Clock()
-font = pygame.font.SysFont("Comic Sans MS", 20)
-big_font = pygame.font.SysFont("Comic Sans MS", 32)
+# -------------------- OVERLAY LAYOUT --------------------
+OVERLAY_W = int(WIDTH * 0.7)
+OVERLAY_H = int(HEIGHT * 0.7)
+OVERLAY_X = (WIDTH - OVERLAY_W) // 2
+OVERLAY_Y = (HEIGHT - OVERLAY_H) // 2
+
+pacer = FramePacer()
+font = fonts.get("Comic Sans MS", 20)
+big_font = fonts.get("Comic Sans MS", 32)
+text_cache = TextCache()
 
 # -------------------- COLORS --------------------
 WHITE = (255, 255, 255)
@@ -37,75 +82,117 @@ COZY = (249, 230, 197)
 BUTTON = (155, 182, 130)
 BUTTON_HOVER = (135, 162, 110)
 
+# -------------------- RENDER SETTINGS --------------------
+# Only repaint and push the screen regions that changed since the last frame
+DIRTY_RECTS = True
+
+# -------------------- PROFILER --------------------
+# F3 toggles the frame profiler HUD, F4 saves the recorded frames as CSV
+profiler = Profiler(["events", "decay", "dirty", "backdrop", "stats", "buttons", "chores", "store", "finances", "hud", "present"])
+HUD_LINE = 16
+HUD_RECT = pygame.Rect(WIDTH - 245, 5, 240, HUD_LINE * (len(profiler.sections) + 3) + 8)
+
 # -------------------- SAVE SETTINGS --------------------
-SAVE_FILE = "save_data.json"
+SAVES_DIR = "saves"  # one folder per save slot, plus the slot index
+SAVE_FILE = "save_data.json"  # these are inside a slot's folder
+LEDGER_FILE = "ledger.jsonl"
+LEDGER_SNAPSHOT_FILE = "ledger_snapshot.json"
+THUMBNAIL_FILE = "thumbnail.png"
+THUMBNAIL_SIZE = (120, 80)
 AUTOSAVE_INTERVAL = 10000
 
-# -------------------- CAT CLASS --------------------
-class Cat:
-    def __init__(self, name, cat_type, personality):
-        self.name = name
-        self.cat_type = cat_type
-        self.personality = personality
-        self.hunger = 100
-        self.happiness = 100
-        self.energy = 100
-        self.cleanliness = 100
-        self.health = 100
-
-    def feed(self):
-        self.hunger = min(100, self.hunger + 20)
-
-    def play(self):
-        self.happiness = min(100, self.happiness + 20)
-        self.energy = max(0, self.energy - 5)
-        self.update_health()
-
-    def rest(self):
-        self.energy = min(100, self.energy + 30)
-        self.happiness = min(100, self.happiness + 5)
-        self.update_health()
-
-    def clean(self):
-        self.cleanliness = min(100, self.cleanliness + 30)
-        self.happiness = min(100, self.happiness + 5)
-        self.update_health()
-
-    def update_health(self):
-        self.health = (self.hunger + self.happiness + self.energy + self.cleanliness) / 4
+# -------------------- TIMER EVENTS --------------------
+DECAY_EVENT = pygame.event.custom_type()
+AUTOSAVE_EVENT = pygame.event.custom_type()
+
+# -------------------- DETERMINISM --------------------
+# All game randomness goes through rng and all wall-clock reads through
+# clock(), so a recorded session (--record) replays identically (replay.py)
+rng = random.Random()
+clock = time.time
+
+# Events a recording keeps, with the attributes the game reads from them
+RECORDED_EVENTS = {
+    "quit": (pygame.QUIT, ()),
+    "key": (pygame.KEYDOWN, ("key", "unicode")),
+    "click": (pygame.MOUSEBUTTONDOWN, ("pos", "button")),
+    "motion": (pygame.MOUSEMOTION, ("pos",)),  # minigames follow the pointer
+    "decay": (DECAY_EVENT, ()),
+    "autosave": (AUTOSAVE_EVENT, ()),
+}
 
 # -------------------- SAVE / LOAD --------------------
-def save_game(cat, money, total_spent, inventory):
-    data = {
-        "name": cat.name,
-        "type": cat.cat_type,
-        "personality": cat.personality,
-        "stats": vars(cat),
-        "money": money,
-        "total_spent": total_spent,
-        "inventory": inventory
-    }
-    with open(SAVE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
-def load_game():
-    if not os.path.exists(SAVE_FILE):
-        return None
-    with open(SAVE_FILE, "r") as f:
-        return json.load(f)
+# Every cat lives in a save slot of its own; the rest is set once one is picked
+slots = None
+slot = None
+save_writer = None
+recorder = None  # --record
+
+def open_slots():
+    global slots
+    slots = SaveSlots(SAVES_DIR, SAVE_FILE, THUMBNAIL_FILE)
+    # A save from before there were slots becomes a slot of its own
+    slots.adopt(SAVE_FILE, [LEDGER_FILE, LEDGER_SNAPSHOT_FILE])
+
+def slot_files(slot):
+    return [slots.path(slot, name) for name in (SAVE_FILE, LEDGER_FILE, LEDGER_SNAPSHOT_FILE)]
+
+def open_slot(chosen):
+    global slot, save_writer
+    slot = chosen
+    save_writer = SaveWriter(slots.path(slot, SAVE_FILE), on_write=slot_saved)
+
+def slot_saved(data, thumbnail):
+    # Runs on the save writer's thread after each write, so the index (and
+    # the thumbnail) never cost the frame anything
+    name = None
+    if thumbnail is not None:
+        path = slots.path(slot, THUMBNAIL_FILE)
+        try:
+            with open(path + ".tmp", "wb") as f:
+                pygame.image.save(thumbnail, f, THUMBNAIL_FILE)
+            os.replace(path + ".tmp", path)
+            name = THUMBNAIL_FILE
+        except (pygame.error, OSError):
+            pass  # the picker falls back to the cat's picture
+    slots.record(slot, data, name)
+
+def save_game(sim):
+    # Snapshot only, the actual write happens on the save writer's thread
+    data = sim.to_save()
+    data["saved_at"] = clock()
+    # The profile picker shows a small copy of the main view
+    thumbnail = None
+    if not (in_store or in_chore or in_finances):
+        thumbnail = pygame.transform.smoothscale(screen, THUMBNAIL_SIZE)
+    save_writer.save(data, thumbnail)
+
+def load_game(slot):
+    return load_save(slots.path(slot, SAVE_FILE))
+
+# -------------------- STARTUP --------------------
+first_frame_ms = None
+exit_after_first_frame = False  # --startup-time
+
+def frame_presented():
+    # Called after every presented frame; the first one finishes startup
+    global first_frame_ms
+    if first_frame_ms is not None:
+        return
+    first_frame_ms = (time.perf_counter() - STARTED) * 1000
+    pygame.display.set_icon(sprites.get("icon", ICON_SIZE))
+    # Nothing is preloaded before this, so the thread never competes with the
+    # first frame; sounds are needed on the first click, cats on the setup
+    # screen's arrows (the preview already decoded the first one)
+    assets.preload(CLICK_SOUNDS + ["error"])
+    assets.preload({sprites.source(cat_type, PREVIEW_SIZE) for cat_type in CAT_TYPES}, priority=2)
+    if exit_after_first_frame:
+        print(f"First frame after {first_frame_ms:.1f} ms")
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
 
 # -------------------- HELPERS --------------------
-def get_mood(cat):
-    if cat.health < 40:
-        return "Sick"
-    elif cat.happiness < 40:
-        return "Sad"
-    elif cat.energy > 80:
-        return "Energetic"
-    return "Happy"
-
-def draw_text(text, x, y, color=BLACK, f=font):
-    screen.blit(f.render(text, True, color), (x, y))
+def draw_text(text, x, y, color=BLACK, f=font, surface=None):
+    (screen if surface is None else surface).blit(text_cache.render(f, text, color), (x, y))
 
 def draw_stat_bar(x, y, width, height, value, max_value, color):
     # Background
@@ -116,24 +203,35 @@ def draw_stat_bar(x, y, width, height, value, max_value, color):
     # Border
     pygame.draw.rect(screen, BLACK, (x, y, width, height), 2, border_radius=5)
 
-def draw_button(rect, text, check_hover=True):
-    mouse = pygame.mouse.get_pos()
-    color = BUTTON_HOVER if (check_hover and rect.collidepoint(mouse)) else BUTTON
+def draw_button(rect, text, hovered=False, surface=None):
+    surface = screen if surface is None else surface
+    color = BUTTON_HOVER if hovered else BUTTON
     # Shadow
     shadow_rect = pygame.Rect(rect.x + 3, rect.y + 3, rect.width, rect.height)
-    pygame.draw.rect(screen, (150, 150, 150), shadow_rect, border_radius=10)
+    pygame.draw.rect(surface, (150, 150, 150), shadow_rect, border_radius=10)
     # Button
-    pygame.draw.rect(screen, color, rect, border_radius=10)
-    pygame.draw.rect(screen, BLACK, rect, 2, border_radius=10)
+    pygame.draw.rect(surface, color, rect, border_radius=10)
+    pygame.draw.rect(surface, BLACK, rect, 2, border_radius=10)
     # Centered text
-    text_surf = font.render(text, True, BLACK)
+    text_surf = text_cache.render(font, text, BLACK)
     text_rect = text_surf.get_rect(center=rect.center)
-    screen.blit(text_surf, text_rect)
+    surface.blit(text_surf, text_rect)
+
+def draw_tooltip(widget):
+    # Hangs off the right edge of the widget
+    tooltip_surf = text_cache.render(font, widget.tooltip(), BLACK)
+    tooltip_x = widget.rect.right + 10
+    tooltip_y = widget.rect.centery - tooltip_surf.get_height() // 2
+    box = (tooltip_x - 5, tooltip_y - 2, tooltip_surf.get_width() + 10, tooltip_surf.get_height() + 4)
+    pygame.draw.rect(screen, (255, 255, 200), box)
+    pygame.draw.rect(screen, BLACK, box, 1)
+    screen.blit(tooltip_surf, (tooltip_x, tooltip_y))
 
 # -------------------- SETUP SCREEN (UPGRADED) --------------------
-def setup_screen():
+def setup_screen(title="Create Your Cat", confirm="Start Game", can_cancel=False):
+    # Returns (name, type, personality), or None on ESC if can_cancel
     name = ""
-    types = ["Orange", "Grey", "White", "Calico"]
+    types = CAT_TYPES
     personalities = ["Playful", "Lazy", "Shy", "Energetic"]
 
     type_index = 0
@@ -144,14 +242,16 @@ def setup_screen():
     arrow_dir = 1
 
     while True:
+        # The arrow never stops bobbing, so this screen always runs at full rate
+        _, events = pacer.wait(animating=True)
         screen.fill(COZY)
 
         arrow_offset += arrow_dir * 0.5
         if abs(arrow_offset) > 5:
             arrow_dir *= -1
 
-        draw_text("Create Your Cat", 50, 30, f=big_font)
-        draw_text("UP/DOWN to select | LEFT/RIGHT to change | ENTER to confirm", 50, 70)
+        draw_text(title, 50, 30, f=big_font)
+        draw_text("UP/DOWN to select | LEFT/RIGHT to change | ENTER to confirm" + (" | ESC to cancel" if can_cancel else ""), 50, 70)
 
         rows = [140, 200, 260, 340]
         # Draw selection arrow
@@ -168,230 +268,317 @@ def setup_screen():
         draw_text(types[type_index], 200, 200)
         draw_text("Personality:", 60, 260)
         draw_text(personalities[pers_index], 200, 260)
-        draw_text("Start Game", 60, 340)
+        draw_text(confirm, 60, 340)
 
         # Preview cat
         preview_x, preview_y = 640, 260
-        scale_x, scale_y = 150, 150
-        cat_image = cat_images[types[type_index]]
-        scaled_cat = pygame.transform.scale(cat_image, (scale_x, scale_y))
+        scaled_cat = sprites.get(types[type_index], PREVIEW_SIZE)
         cat_rect = scaled_cat.get_rect(center=(preview_x, preview_y))
         screen.blit(scaled_cat, cat_rect)
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
 
             if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE and can_cancel:
+                    play_click()
+                    return None
                 if event.key == pygame.K_UP:
                     selection = (selection - 1) % 4
-                    random.choice(click_sounds).play()
+                    play_click()
                 elif event.key == pygame.K_DOWN:
                     selection = (selection + 1) % 4
-                    random.choice(click_sounds).play()
+                    play_click()
                 elif event.key == pygame.K_LEFT:
                     if selection == 1:
                         type_index = (type_index - 1) % len(types)
-                        random.choice(click_sounds).play()
+                        play_click()
                     elif selection == 2:
                         pers_index = (pers_index - 1) % len(personalities)
-                        random.choice(click_sounds).play()
+                        play_click()
                 elif event.key == pygame.K_RIGHT:
                     if selection == 1:
                         type_index = (type_index + 1) % len(types)
-                        random.choice(click_sounds).play()
+                        play_click()
                     elif selection == 2:
                         pers_index = (pers_index + 1) % len(personalities)
-                        random.choice(click_sounds).play()
+                        play_click()
                 elif selection == 0:
                     if event.key == pygame.K_BACKSPACE:
                         name = name[:-1]
-                        random.choice(click_sounds).play()
+                        play_click()
                     elif event.unicode.isalpha() and len(name) < 10:
                         name += event.unicode
-                        random.choice(click_sounds).play()
+                        play_click()
                 elif event.key == pygame.K_RETURN and selection == 3 and name:
-                    random.choice(click_sounds).play()
-                    pygame.time.delay(200)
+                    play_click()
+                    pacer.pause(200)
                     return name, types[type_index], personalities[pers_index]
 
         pygame.display.flip()
-        clock.tick(60)
+        frame_presented()
+
+# -------------------- PROFILE PICKER --------------------
+PICKER_TOP = 120
+PICKER_ROW_H = 90
+PICKER_ROWS = 5  # rows on screen at once, the list scrolls with the selection
+
+def slot_thumbnail(slot, summary, thumbnails):
+    # Loaded the first time the slot's row is on screen. A slot without one
+    # shows its cat, once the preload thread has decoded the (much bigger)
+    # cat picture or the atlas; None until then.
+    thumb = thumbnails.get(slot)
+    if thumb is None:
+        first = slot not in thumbnails
+        if summary["thumbnail"] and first:
+            try:
+                thumb = pygame.image.load(slots.path(slot, summary["thumbnail"])).convert()
+            except (pygame.error, OSError):
+                pass
+        if thumb is None:
+            source = sprites.source(summary["cat_type"], CAT_THUMBNAIL_SIZE)
+            if not assets.ready(source):
+                if first:
+                    assets.preload([source], priority=0)
+                thumbnails[slot] = None
+                return None
+            thumb = sprites.get(summary["cat_type"], CAT_THUMBNAIL_SIZE)
+        thumbnails[slot] = thumb
+    return thumb
+
+def profile_screen():
+    # Lists the save slots from the index alone; returns the picked slot,
+    # or None for a new cat
+    entries = slots.list()
+    choices = len(entries) + 1  # the last row makes a new cat
+    thumbnails = {}
+    selection = 0
+    first = 0
 
-# -------------------- GAME SETUP --------------------
-save_data = load_game()
-
-if save_data:
-    cat = Cat(save_data["name"], save_data["type"], save_data["personality"])
-    for k, v in save_data["stats"].items():
-        setattr(cat, k, v)
-    money = save_data["money"]
-    total_spent = save_data["total_spent"]
-    inventory = save_data["inventory"]
-else:
-    cat_name, cat_type, personality = setup_screen()
-    cat = Cat(cat_name, cat_type, personality)
-    money = 50
-    total_spent = 0
-    inventory = {}
-
-store_prices = {"Meowmunch": 5, "Purrplay": 10, "Furbath": 15}
+    arrow_offset = 0
+    arrow_dir = 1
 
-# Store UI message/tooltip state
-STORE_MSG_DURATION = 2000  # ms
-store_message = ""
-store_message_timer = 0
+    while True:
+        _, events = pacer.wait(animating=True)
+        screen.fill(COZY)
 
-feed_btn = pygame.Rect(50, 500, 100, 40)
-play_btn = pygame.Rect(160, 500, 100, 40)
-clean_btn = pygame.Rect(270, 500, 100, 40)
-rest_btn = pygame.Rect(380, 500, 100, 40)
-chore_btn = pygame.Rect(700, 500, 160, 40)
-store_btn = pygame.Rect(700, 440, 160, 40)
+        arrow_offset += arrow_dir * 0.5
+        if abs(arrow_offset) > 5:
+            arrow_dir *= -1
 
-# -------------------- MAIN LOOP --------------------
-running = True
-time_passed = autosave_timer = 0
-in_store = False
-in_chore = False
-active_minigame = None
-trash_items = []
-trash_collected = 0
+        draw_text("Choose Your Cat", 50, 30, f=big_font)
+        draw_text("UP/DOWN to select | ENTER to play", 50, 70)
+
+        # Scroll just far enough to keep the selection on screen
+        first = min(max(first, selection - PICKER_ROWS + 1), selection)
+        for row, i in enumerate(range(first, min(first + PICKER_ROWS, choices))):
+            y = PICKER_TOP + row * PICKER_ROW_H
+            if i == len(entries):
+                draw_text("+ New Cat", 210, y + 30)
+                continue
+            slot, summary = entries[i]
+            thumb = slot_thumbnail(slot, summary, thumbnails)
+            if thumb is not None:
+                screen.blit(thumb, thumb.get_rect(center=(140, y + 40)))
+            last_played = summary["last_played"]
+            played = time.strftime("%b %d, %H:%M", time.localtime(last_played)) if last_played else "never"
+            draw_text(f"{summary['name']} the {summary['cat_type']} cat ({summary['personality']})", 210, y + 15)
+            draw_text(f"Money: ${summary['money']}   Last played: {played}", 210, y + 45)
+
+        row_y = PICKER_TOP + (selection - first) * PICKER_ROW_H + 30
+        pygame.draw.polygon(
+            screen, BLACK,
+            [(30 + arrow_offset, row_y + 10),
+             (50 + arrow_offset, row_y),
+             (50 + arrow_offset, row_y + 20)]
+        )
 
-while running:
-    dt = clock.tick(60)
-    time_passed += dt
-    autosave_timer += dt
-    store_message_timer = max(0, store_message_timer - dt)
+        for event in events:
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
 
-    if autosave_timer >= AUTOSAVE_INTERVAL:
-        save_game(cat, money, total_spent, inventory)
-        autosave_timer = 0
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    selection = (selection - 1) % choices
+                    play_click()
+                elif event.key == pygame.K_DOWN:
+                    selection = (selection + 1) % choices
+                    play_click()
+                elif event.key == pygame.K_RETURN:
+                    play_click()
+                    pacer.pause(200)
+                    return entries[selection][0] if selection < len(entries) else None
 
-    screen.fill(COZY)
+        pygame.display.flip()
+        frame_presented()
 
-    # -------------------- EVENT HANDLING --------------------
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            save_game(cat, money, total_spent, inventory)
-            running = False
+# -------------------- GAME SETUP --------------------
+CHART_RECT = pygame.Rect(280, 110, OVERLAY_W - 320, 200)  # in overlay coordinates
+
+sim = None
+ledger = None
+spending = None
+
+def start_game():
+    global sim, ledger, spending
+    if slots is None:
+        open_slots()
+    # Only the picked slot's files are ever opened
+    chosen = profile_screen() if slots.summaries else None
+    save_data = None
+    if chosen is not None:
+        if recorder:
+            recorder.capture(slot_files(chosen))
+        save_data = load_game(chosen)
+
+    if save_data:
+        sim = Simulation.from_save(save_data)
+        # Catch up on decay that happened while the game was closed
+        if "saved_at" in save_data:
+            sim.catch_up((clock() - save_data["saved_at"]) * 1000)
+    else:
+        cat_name, cat_type, personality = setup_screen()
+        sim = Simulation(Cat(cat_name, cat_type, personality))
+        if chosen is None:
+            chosen = slots.create()
+    open_slot(chosen)
+
+    # Money and inventory come from the transaction ledger when there is one,
+    # and so do the spending aggregates, which are saved with its snapshots
+    _, ledger_file, snapshot_file = slot_files(chosen)
+    spending = SpendingStats(CHART_RECT.width)
+    ledger = Ledger(ledger_file, snapshot_file, clock=clock, views={"spending": spending})
+    books = ledger.load() if save_data else None
+    if books:
+        sim.money = books["money"]
+        sim.total_spent = books["total_spent"]
+        sim.inventory = dict(books["inventory"])
+    else:
+        ledger.start(sim.money, sim.total_spent, sim.inventory)
+    sim.listeners.append(ledger.append)
+
+CHORES = [("Take Out The Trash", "trash"), ("Put Away Laundry", "laundry"), ("Stove Top Sizzler", "stovetop")]
+PLAY_AREA = pygame.Rect(OVERLAY_X + 20, OVERLAY_Y + 100, OVERLAY_W - 40, OVERLAY_H - 120)  # below the minigame status line
 
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE and in_store:
-                in_store = False
-            if event.key == pygame.K_ESCAPE and in_chore:
-                in_chore = False
+# Store UI message/tooltip state
+STORE_MSG_DURATION = 2000  # ms
+store_message = ""
+store_message_timer = 0
+
+# -------------------- WIDGETS --------------------
+# Laid out once here; clicks and hover are routed through the tree, and the
+# draw code below reads each widget's rect and hover state
+def care_button(rect, label, action):
+    def click(event):
+        if action():
+            play_click()
+    return Widget(rect, label, click)
+
+def adopt_cat(event):
+    # The setup screen takes over the window until the new cat is named
+    play_click()
+    choice = setup_screen("Adopt a Cat", "Adopt", can_cancel=True)
+    if choice:
+        sim.cat = sim.adopt(Cat(*choice))
+    dirty.invalidate()
+
+def next_cat(event):
+    if len(sim.household) > 1:
+        play_click()
+        sim.next_cat()
+
+def open_chores(event):
+    global in_chore
+    play_click()
+    in_chore = True
+
+def open_store(event):
+    global in_store
+    play_click()
+    in_store = True
+
+def open_finances(event):
+    global in_finances
+    play_click()
+    in_finances = True
+
+def close_overlay(event):
+    global in_store, in_chore, in_finances, active_minigame
+    play_click()
+    if in_chore:
+        active_minigame = None
+    in_store = in_chore = in_finances = False
+
+def buy_item(item):
+    def click(event):
+        global store_message, store_message_timer
+        if sim.buy(item):
+            play_click()
+        else:
+            # show temporary insufficient funds message
+            sounds.play("error", "error")
+            store_message = "Insufficient funds"
+            store_message_timer = STORE_MSG_DURATION
+    return click
+
+def store_tooltip(item):
+    return lambda: "Not enough money" if sim.money < sim.prices[item] else "Click to buy"
+
+def start_chore(chore_id):
+    def click(event):
+        global active_minigame
+        play_click()
+        active_minigame = MINIGAMES[chore_id](PLAY_AREA, rng)
+    return click
+
+def click_minigame(event):
+    if active_minigame.click(event.pos):
+        play_click()
+
+ui = WidgetTree()
+main_buttons = [
+    care_button((50, 500, 100, 40), "Feed", lambda: sim.feed()),
+    care_button((160, 500, 100, 40), "Play", lambda: sim.play()),
+    care_button((380, 500, 100, 40), "Rest", lambda: sim.rest()),
+    care_button((270, 500, 100, 40), "Clean", lambda: sim.clean()),
+    Widget((490, 500, 100, 40), "Adopt", adopt_cat),
+    Widget((490, 440, 100, 40), "Next Cat", next_cat),
+    Widget((700, 500, 160, 40), "The Taskboard", open_chores),
+    Widget((700, 440, 160, 40), "Whiskermart", open_store),
+    Widget((700, 380, 160, 40), "Finances", open_finances)
+]
+for button in main_buttons:
+    ui.add(button)
+
+# Covers the whole window, so nothing under an open overlay gets clicks or hover
+overlay = ui.add(Widget((0, 0, WIDTH, HEIGHT)))
+back_button = overlay.add(Widget((OVERLAY_X + OVERLAY_W - 110, OVERLAY_Y + 16, 90, 36), "Back", close_overlay))
+store_group = overlay.add(Widget())
+store_buttons = {}
+for i, item in enumerate(STORE_PRICES):
+    rect = (OVERLAY_X + 40, OVERLAY_Y + 80 + i * 70, OVERLAY_W - 80, 50)
+    store_buttons[item] = store_group.add(Widget(rect, item.title(), buy_item(item), store_tooltip(item)))
+chore_group = overlay.add(Widget())
+chore_buttons = []
+for i, (chore_name, chore_id) in enumerate(CHORES):
+    rect = (OVERLAY_X + 50, OVERLAY_Y + 100 + i * 80, OVERLAY_W - 100, 60)
+    chore_buttons.append(chore_group.add(Widget(rect, chore_name, start_chore(chore_id))))
+minigame_area = overlay.add(Widget(PLAY_AREA, on_click=click_minigame))
+
+def sync_ui():
+    # Which widgets are live follows the screen flags
+    overlay.show(in_store or in_chore or in_finances)
+    store_group.show(in_store)
+    chore_group.show(in_chore and active_minigame is None)
+    minigame_area.show(in_chore and active_minigame is not None)
+
+# -------------------- MAIN SCREEN --------------------
+def draw_main_screen():
+    screen.fill(COZY)
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if in_store:
-                # clicks only affect store overlay while open
-                overlay_w = int(WIDTH * 0.7)
-                overlay_h = int(HEIGHT * 0.7)
-                overlay_x = (WIDTH - overlay_w) // 2
-                overlay_y = (HEIGHT - overlay_h) // 2
-
-                # Back button (top-right of overlay)
-                back_rect = pygame.Rect(overlay_x + overlay_w - 110, overlay_y + 16, 90, 36)
-                if back_rect.collidepoint(event.pos):
-                    random.choice(click_sounds).play()
-                    in_store = False
-                else:
-                    item_x = overlay_x + 40
-                    y = overlay_y + 80
-                    item_w = overlay_w - 80
-                    item_h = 50
-                    for item, price in store_prices.items():
-                        rect = pygame.Rect(item_x, y, item_w, item_h)
-                        if rect.collidepoint(event.pos):
-                            if money >= price:
-                                random.choice(click_sounds).play()
-                                money -= price
-                                total_spent += price
-                                inventory[item] = inventory.get(item, 0) + 1
-                            else:
-                                # show temporary insufficient funds message
-                                error_sound.play()
-                                store_message = "Insufficient funds"
-                                store_message_timer = STORE_MSG_DURATION
-                        y += item_h + 20
-            elif in_chore:
-                # Handle minigame interactions
-                if active_minigame == "trash":
-                    # Check if trash items were clicked
-                    for trash in trash_items:
-                        if not trash["collected"]:
-                            trash_rect = pygame.Rect(trash["x"], trash["y"], 30, 30)
-                            if trash_rect.collidepoint(event.pos):
-                                random.choice(click_sounds).play()
-                                trash["collected"] = True
-                
-                # clicks only affect chore overlay while open
-                overlay_w = int(WIDTH * 0.7)
-                overlay_h = int(HEIGHT * 0.7)
-                overlay_x = (WIDTH - overlay_w) // 2
-                overlay_y = (HEIGHT - overlay_h) // 2
-
-                # Back button (top-right of overlay)
-                back_rect = pygame.Rect(overlay_x + overlay_w - 110, overlay_y + 16, 90, 36)
-                if back_rect.collidepoint(event.pos):
-                    random.choice(click_sounds).play()
-                    in_chore = False
-                    active_minigame = None
-                else:
-                    # Chore buttons (only show if not in minigame)
-                    if not active_minigame:
-                        chore_x = overlay_x + 50
-                        chore_y = overlay_y + 100
-                        chore_w = overlay_w - 100
-                        chore_h = 60
-                        chores = [("Take Out The Trash", "trash"), ("Put Away Laundry", "laundry"), ("Stove Top Sizzler", "stovetop")]
-                        for i, (chore_name, chore_id) in enumerate(chores):
-                            rect = pygame.Rect(chore_x, chore_y + i * (chore_h + 20), chore_w, chore_h)
-                            if rect.collidepoint(event.pos):
-                                random.choice(click_sounds).play()
-                                active_minigame = chore_id
-                                if chore_id == "trash":
-                                    trash_items = []
-                                    trash_collected = 0
-                                    for j in range(5):
-                                        x = overlay_x + 80 + random.randint(0, overlay_w - 160)
-                                        y = overlay_y + 120 + random.randint(0, overlay_h - 200)
-                                        trash_items.append({"x": x, "y": y, "collected": False})
-            else:
-                # normal game buttons (only when store/chore is closed)
-                if feed_btn.collidepoint(event.pos) and inventory.get("Meowmunch", 0) > 0:
-                    random.choice(click_sounds).play()
-                    cat.feed()
-                    inventory["Meowmunch"] -= 1
-                if play_btn.collidepoint(event.pos) and inventory.get("Purrplay", 0) > 0:
-                    random.choice(click_sounds).play()
-                    cat.play()
-                    inventory["Purrplay"] -= 1
-                if rest_btn.collidepoint(event.pos):
-                    random.choice(click_sounds).play()
-                    cat.rest()
-                if clean_btn.collidepoint(event.pos) and inventory.get("Furbath", 0) > 0:
-                    random.choice(click_sounds).play()
-                    cat.clean()
-                    inventory["Furbath"] -= 1
-                if chore_btn.collidepoint(event.pos):
-                    random.choice(click_sounds).play()
-                    in_chore = True
-                if store_btn.collidepoint(event.pos):
-                    random.choice(click_sounds).play()
-                    in_store = not in_store
-
-    # -------------------- TIME PASSING --------------------
-    if time_passed > 5000:
-        cat.hunger = max(0, cat.hunger - 2)
-        cat.happiness = max(0, cat.happiness - 1)
-        cat.energy = max(0, cat.energy - 1)
-        cat.cleanliness = max(0, cat.cleanliness - 1)
-        cat.update_health()
-        time_passed = 0
-
-    # -------------------- POLISHED UI --------------------
     # Left panel stats
     panel_x = 50
     panel_y = 140
@@ -400,16 +587,19 @@ while running:
     bar_height = 20
 
     stats = [
-        ("Hunger", cat.hunger, (255, 100, 100)),
-        ("Happiness", cat.happiness, (255, 255, 100)),
-        ("Energy", cat.energy, (100, 255, 100)),
-        ("Cleanliness", cat.cleanliness, (100, 200, 255)),
-        ("Health", cat.health, (255, 150, 255))
+        ("Hunger", sim.cat.hunger, (255, 100, 100)),
+        ("Happiness", sim.cat.happiness, (255, 255, 100)),
+        ("Energy", sim.cat.energy, (100, 255, 100)),
+        ("Cleanliness", sim.cat.cleanliness, (100, 200, 255)),
+        ("Health", sim.cat.health, (255, 150, 255))
     ]
 
-    draw_text(f"{cat.name} the {cat.cat_type} Cat", 50, 30, f=big_font)
-    draw_text(f"Personality: {cat.personality}", 50, 70)
-    draw_text(f"Mood: {get_mood(cat)}", 50, 100)
+    draw_text(f"{sim.cat.name} the {sim.cat.cat_type} Cat", 50, 30, f=big_font)
+    draw_text(f"Personality: {sim.cat.personality}", 50, 70)
+    draw_text(f"Mood: {get_mood(sim.cat)}", 50, 100)
+    if len(sim.household) > 1:
+        moods = ", ".join(f"{count} {mood}" for mood, count in sim.household.mood_counts().items() if count)
+        draw_text(f"Household: {len(sim.household)} cats ({moods})", 250, 100)
 
     for i, (label, value, color) in enumerate(stats):
         y = panel_y + i * panel_spacing
@@ -418,140 +608,346 @@ while running:
 
     # Right panel money/inventory
     right_x = 700
-    draw_text(f"Total Spent: ${total_spent}", right_x, 50)
-    draw_text(f"Money: ${money}", right_x, 80)
-    draw_text(f"Meowmunch: {inventory.get('Meowmunch',0)}", right_x, 110)
-    draw_text(f"Purrplay: {inventory.get('Purrplay',0)}", right_x, 140)
-    draw_text(f"Furbath: {inventory.get('Furbath',0)}", right_x, 170)
-
-    # Buttons (disable hover when store/chore is open)
-    draw_button(feed_btn, "Feed", check_hover=not in_store and not in_chore)
-    draw_button(play_btn, "Play", check_hover=not in_store and not in_chore)
-    draw_button(rest_btn, "Rest", check_hover=not in_store and not in_chore)
-    draw_button(clean_btn, "Clean", check_hover=not in_store and not in_chore)
-    draw_button(chore_btn, "The Taskboard", check_hover=not in_store and not in_chore)
-    draw_button(store_btn, "Whiskermart", check_hover=not in_store and not in_chore)
+    draw_text(f"Total Spent: ${sim.total_spent}", right_x, 50)
+    draw_text(f"Money: ${sim.money}", right_x, 80)
+    draw_text(f"Meowmunch: {sim.inventory.get('Meowmunch',0)}", right_x, 110)
+    draw_text(f"Purrplay: {sim.inventory.get('Purrplay',0)}", right_x, 140)
+    draw_text(f"Furbath: {sim.inventory.get('Furbath',0)}", right_x, 170)
+    if profiler.enabled:
+        profiler.lap("stats")
+
+    # Buttons (never hovered while an overlay is open)
+    for button in main_buttons:
+        draw_button(button.rect, button.label, button.hovered)
+    if profiler.enabled:
+        profiler.lap("buttons")
+
+# -------------------- OVERLAY LAYERS --------------------
+# Static parts of each overlay are drawn once into an offscreen layer, in
+# coordinates relative to the overlay's top-left corner.
+def draw_overlay_frame(surface, title):
+    # Shadow
+    pygame.draw.rect(surface, (150, 150, 150), (6, 6, OVERLAY_W, OVERLAY_H), border_radius=12)
+    # Background
+    pygame.draw.rect(surface, COZY, (0, 0, OVERLAY_W, OVERLAY_H), border_radius=12)
+    pygame.draw.rect(surface, BLACK, (0, 0, OVERLAY_W, OVERLAY_H), 2, border_radius=12)
+
+    draw_text(title, 20, 12, f=big_font, surface=surface)
+    draw_button(back_button.rect.move(-OVERLAY_X, -OVERLAY_Y), "Back", surface=surface)
+
+def build_store_layer(surface):
+    draw_overlay_frame(surface, "Whiskermart")
+    for item, button in store_buttons.items():
+        draw_button(button.rect.move(-OVERLAY_X, -OVERLAY_Y), f"{button.label} - ${sim.prices[item]}", surface=surface)
+
+def build_chore_layer(surface):
+    draw_overlay_frame(surface, "The Taskboard")
+    for button in chore_buttons:
+        draw_button(button.rect.move(-OVERLAY_X, -OVERLAY_Y), button.label, surface=surface)
+
+def minigame_layer(title):
+    return Layer(overlay_area, lambda surface: draw_overlay_frame(surface, title), alpha=True)
+
+def draw_spending_chart(surface, rect):
+    # Cumulative income (green) and expenses (red) over time, from zero at
+    # the first transaction to the end of the latest bucket
+    pygame.draw.rect(surface, WHITE, rect)
+    pygame.draw.rect(surface, BLACK, rect, 1)
+    points = spending.series.cumulative()
+    if not points:
+        draw_text("No transactions yet", rect.x + 10, rect.y + 10, surface=surface)
+        return
+
+    points.insert(0, (0, 0))
+    top = max(points[-1]) or 1
+    step = (rect.width - 1) / (len(points) - 1)
+    for idx, color in ((0, (60, 160, 60)), (1, (200, 60, 60))):
+        line = [(rect.x + i * step, rect.bottom - 2 - p[idx] * (rect.height - 4) / top) for i, p in enumerate(points)]
+        pygame.draw.lines(surface, color, False, line, 2)
+
+def build_finances_layer(surface):
+    draw_overlay_frame(surface, "Finances")
+
+    today = day_of(clock())
+    day_in, day_out = spending.today(today)
+    week_in, week_out = spending.week(today)
+    draw_text(f"Income: ${spending.income}", 30, 70, surface=surface)
+    draw_text(f"Expenses: ${spending.expenses}", 30, 100, surface=surface)
+    draw_text(f"Today: +${day_in} / -${day_out}", 30, 140, surface=surface)
+    draw_text(f"This week: +${week_in} / -${week_out}", 30, 170, surface=surface)
+
+    draw_text("Spent per item", 30, 215, surface=surface)
+    for i, item in enumerate(sim.prices):
+        spent, bought = spending.by_item.get(item, (0, 0))
+        draw_text(f"{item}: ${spent} ({bought})", 30, 245 + i * 30, surface=surface)
+
+    draw_spending_chart(surface, CHART_RECT)
+    draw_text("Income", CHART_RECT.x, CHART_RECT.bottom + 10, (60, 160, 60), surface=surface)
+    draw_text("Expenses", CHART_RECT.x + 100, CHART_RECT.bottom + 10, (200, 60, 60), surface=surface)
+
+overlay_area = (OVERLAY_X, OVERLAY_Y, OVERLAY_W + 6, OVERLAY_H + 6)
+store_layer = Layer(overlay_area, build_store_layer, alpha=True)
+chore_layer = Layer(overlay_area, build_chore_layer, alpha=True)
+minigame_layers = {chore_id: minigame_layer(game.title) for chore_id, game in MINIGAMES.items()}
+finances_layer = Layer(overlay_area, build_finances_layer, alpha=True)
+backdrop = Layer((0, 0, WIDTH, HEIGHT))
+
+def build_profiler_hud(surface):
+    # Rolling average and worst frame per section, in ms
+    hud_font = assets.get("hud")
+    surface.fill((0, 0, 0, 180))
+    def line(row, name, avg="", peak=""):
+        y = 4 + row * HUD_LINE
+        surface.blit(hud_font.render(name, True, WHITE), (6, y))
+        for text, right in ((avg, 160), (peak, 230)):
+            surf = hud_font.render(text, True, WHITE)
+            surface.blit(surf, (right - surf.get_width(), y))
+
+    line(0, "Profiler (ms)", "avg", "max")
+    if not profiler.report:
+        line(1, "collecting...")
+    for row, (name, avg, peak) in enumerate(profiler.report, 1):
+        line(row, name, f"{avg:.2f}", f"{peak:.2f}")
+    line(len(profiler.sections) + 2, profiler.note or "F4: save CSV")
+
+hud_layer = Layer(HUD_RECT, build_profiler_hud, alpha=True)
+
+# Semi-transparent dimming layer
+dim_layer = pygame.Surface((WIDTH, HEIGHT))
+dim_layer.set_alpha(120)
+dim_layer.fill(BLACK)
+
+# -------------------- MAIN LOOP --------------------
+running = True
+in_store = False
+in_chore = False
+in_finances = False
+active_minigame = None
+dirty = DirtyRegions((WIDTH, HEIGHT))
+
+def run_frame(dt, events):
+    # Handles one frame's events and redraws what changed. Returns False
+    # once the game should quit.
+    global running, in_store, in_chore, in_finances, active_minigame
+    global store_message, store_message_timer
+    store_message_timer = max(0, store_message_timer - dt)
+
+    # -------------------- EVENT HANDLING --------------------
+    for event in events:
+        # Time passing and autosave are driven by timer events
+        if event.type == DECAY_EVENT:
+            if profiler.enabled:
+                profiler.lap("events")
+            sim.step()
+            if profiler.enabled:
+                profiler.lap("decay")
+        if event.type == AUTOSAVE_EVENT:
+            save_game(sim)
+
+        if event.type == pygame.QUIT:
+            save_game(sim)
+            running = False
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE and in_store:
+                in_store = False
+            if event.key == pygame.K_ESCAPE and in_chore:
+                in_chore = False
+            if event.key == pygame.K_ESCAPE and in_finances:
+                in_finances = False
+            if event.key == pygame.K_F3:
+                profiler.toggle()
+            if event.key == pygame.K_F4 and profiler.enabled:
+                profiler.dump_csv(time.strftime("profile_%Y%m%d_%H%M%S.csv"))
+
+        # Clicks and hover go to the top-most live widget under the pointer
+        if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
+            sync_ui()
+            ui.dispatch(event)
+
+    sync_ui()
+    if profiler.enabled:
+        profiler.lap("events")
+
+    # -------------------- MINIGAME --------------------
+    # Paused while the Taskboard is closed
+    if in_chore and active_minigame is not None:
+        active_minigame.update(dt, ui.pointer)
+        if active_minigame.done:
+            sim.complete_chore(active_minigame.chore_id)
+            active_minigame = None
+            sync_ui()
+        if profiler.enabled:
+            profiler.lap("chores")
+
+    # -------------------- DIRTY REGIONS --------------------
+    overlay_open = in_store or in_chore or in_finances
+    finances_key = (spending.version, day_of(clock()))
+    household_state = tuple(sim.household.mood_counts().values()) if len(sim.household) > 1 else None
+    header_state = (sim.cat.name, sim.cat.cat_type, sim.cat.personality, get_mood(sim.cat), household_state)
+    stat_state = (sim.cat.hunger, sim.cat.happiness, sim.cat.energy, sim.cat.cleanliness, sim.cat.health)
+    wallet_state = (sim.total_spent, sim.money, tuple(sorted(sim.inventory.items())))
+    backdrop_key = (header_state, stat_state, wallet_state)
+
+    if DIRTY_RECTS:
+        # Opening/closing an overlay or switching minigame repaints everything
+        mode = (in_store, in_chore, in_finances, active_minigame)
+        if dirty.states.get("mode") != mode:
+            dirty.states["mode"] = mode
+            dirty.invalidate()
+
+        dirty.track("header", (0, 0, 690, 135), header_state)
+        dirty.track("stats", (40, 135, 340, 180), stat_state)
+        dirty.track("wallet", (700, 45, WIDTH - 700, 160), wallet_state)
+        for button in main_buttons:
+            dirty.track(button, button.rect.inflate(6, 6), button.hovered)
+
+        if overlay_open:
+            dirty.track(back_button, back_button.rect.inflate(6, 6), back_button.hovered)
+        if in_store:
+            dirty.track("store_money", (OVERLAY_X + OVERLAY_W - 260, OVERLAY_Y + 12, 150, 40), sim.money)
+            for item, button in store_buttons.items():
+                rect = button.rect
+                # Tooltip hangs off the right edge of the item button
+                area = pygame.Rect(rect.x, rect.y - 10, WIDTH - rect.x, rect.height + 20)
+                dirty.track(button, area, (button.hovered, button.hovered and sim.money >= sim.prices[item]))
+            dirty.track("store_message", (OVERLAY_X, OVERLAY_Y + OVERLAY_H - 60, OVERLAY_W, 50), store_message_timer > 0 and store_message)
+        elif in_chore and active_minigame is not None:
+            dirty.track("minigame", overlay_area, active_minigame.version)
+        elif in_finances:
+            dirty.track("finances", overlay_area, finances_key)
+        elif in_chore:
+            for button in chore_buttons:
+                dirty.track(button, button.rect.inflate(6, 6), button.hovered)
+
+        dirty.track("hud", HUD_RECT, profiler.enabled and profiler.version)
+
+        # Rebuilding the backdrop needs an unclipped main screen underneath
+        if overlay_open and backdrop.stale(backdrop_key):
+            dirty.invalidate()
+        if profiler.enabled:
+            profiler.lap("dirty")
+        if not dirty.pending():
+            return running
+        dirty.begin(screen)
+
+    # -------------------- MAIN SCREEN --------------------
+    if overlay_open and not backdrop.stale(backdrop_key):
+        # Main screen is frozen and dimmed under an overlay, reuse the snapshot
+        screen.blit(backdrop.surface, (0, 0))
+    else:
+        draw_main_screen()
+        if overlay_open:
+            screen.blit(dim_layer, (0, 0))
+            backdrop.capture(screen, backdrop_key)
+    if profiler.enabled:
+        profiler.lap("backdrop")
 
     # Chore overlay (centered, covers ~70% of screen)
     if in_chore:
-        overlay_w = int(WIDTH * 0.7)
-        overlay_h = int(HEIGHT * 0.7)
-        overlay_x = (WIDTH - overlay_w) // 2
-        overlay_y = (HEIGHT - overlay_h) // 2
-
-        # Semi-transparent dimming layer
-        dim_surf = pygame.Surface((WIDTH, HEIGHT))
-        dim_surf.set_alpha(120)
-        dim_surf.fill(BLACK)
-        screen.blit(dim_surf, (0, 0))
-
-        # Shadow
-        pygame.draw.rect(screen, (150, 150, 150), (overlay_x+6, overlay_y+6, overlay_w, overlay_h), border_radius=12)
-        # Background
-        pygame.draw.rect(screen, COZY, (overlay_x, overlay_y, overlay_w, overlay_h), border_radius=12)
-        pygame.draw.rect(screen, BLACK, (overlay_x, overlay_y, overlay_w, overlay_h), 2, border_radius=12)
-
-        # Back button (top-right)
-        back_rect = pygame.Rect(overlay_x + overlay_w - 110, overlay_y + 16, 90, 36)
-        draw_button(back_rect, "Back")
-
-        # Handle minigames
-        if active_minigame == "trash":
-            # Render trash minigame
-            draw_text("Take Out The Trash", overlay_x + 20, overlay_y + 12, f=big_font)
-            
-            # Count collected trash
-            trash_collected = sum(1 for t in trash_items if t["collected"])
-            draw_text(f"Trash: {trash_collected}/5 Collected", overlay_x + 50, overlay_y + 70)
-            
-            # Draw trash items
-            for trash in trash_items:
-                if not trash["collected"]:
-                    trash_rect = pygame.Rect(trash["x"], trash["y"], 30, 30)
-                    pygame.draw.rect(screen, (139, 90, 43), trash_rect, border_radius=5)
-                    pygame.draw.rect(screen, BLACK, trash_rect, 2, border_radius=5)
-            
-            # Check if all trash collected
-            if trash_collected == 5:
-                money += 5
-                active_minigame = None
-                trash_items = []
+        if active_minigame is not None:
+            minigame_layers[active_minigame.chore_id].draw(screen)
+            if back_button.hovered:
+                draw_button(back_button.rect, "Back", True)
+            draw_text(active_minigame.status(), OVERLAY_X + 50, OVERLAY_Y + 70)
+            active_minigame.draw(screen)
+
         else:
-            # Show chore buttons
-            draw_text("The Taskboard", overlay_x + 20, overlay_y + 12, f=big_font)
-
-            # Chore buttons
-            chore_x = overlay_x + 50
-            chore_y = overlay_y + 100
-            chore_w = overlay_w - 100
-            chore_h = 60
-            chores = [("Take Out The Trash", "trash"), ("Put Away Laundry", "laundry"), ("Stove Top Sizzler", "stovetop")]
-            for i, (chore_name, chore_id) in enumerate(chores):
-                rect = pygame.Rect(chore_x, chore_y + i * (chore_h + 20), chore_w, chore_h)
-                draw_button(rect, chore_name)
+            # Chore buttons are part of the layer, only the hovered one is redrawn
+            chore_layer.draw(screen)
+            if back_button.hovered:
+                draw_button(back_button.rect, "Back", True)
+            for button in chore_buttons:
+                if button.hovered:
+                    draw_button(button.rect, button.label, True)
+        if profiler.enabled:
+            profiler.lap("chores")
 
     # Store overlay (centered, covers ~70% of screen)
     if in_store:
-        overlay_w = int(WIDTH * 0.7)
-        overlay_h = int(HEIGHT * 0.7)
-        overlay_x = (WIDTH - overlay_w) // 2
-        overlay_y = (HEIGHT - overlay_h) // 2
-
-        # Semi-transparent dimming layer
-        dim_surf = pygame.Surface((WIDTH, HEIGHT))
-        dim_surf.set_alpha(120)
-        dim_surf.fill(BLACK)
-        screen.blit(dim_surf, (0, 0))
-
-        # Shadow
-        pygame.draw.rect(screen, (150, 150, 150), (overlay_x+6, overlay_y+6, overlay_w, overlay_h), border_radius=12)
-        # Background
-        pygame.draw.rect(screen, COZY, (overlay_x, overlay_y, overlay_w, overlay_h), border_radius=12)
-        pygame.draw.rect(screen, BLACK, (overlay_x, overlay_y, overlay_w, overlay_h), 2, border_radius=12)
-
-        # Title and money
-        draw_text("Whiskermart", overlay_x + 20, overlay_y + 12, f=big_font)
-        draw_text(f"Money: ${money}", overlay_x + overlay_w - 260, overlay_y + 20)
-
-        # Back button (top-right)
-        back_rect = pygame.Rect(overlay_x + overlay_w - 110, overlay_y + 16, 90, 36)
-        draw_button(back_rect, "Back")
-
-        # Items with hover detection
-        item_x = overlay_x + 40
-        y = overlay_y + 80
-        item_w = overlay_w - 80
-        item_h = 50
-        mouse = pygame.mouse.get_pos()
-        for item, price in store_prices.items():
-            rect = pygame.Rect(item_x, y, item_w, item_h)
-            draw_button(rect, f"{item.title()} - ${price}")
-            # Hover tooltip
-            if rect.collidepoint(mouse):
-                if money < price:
-                    tooltip = "Not enough money"
-                else:
-                    tooltip = "Click to buy"
-                tooltip_surf = font.render(tooltip, True, BLACK)
-                tooltip_x = rect.right + 10
-                tooltip_y = rect.centery - tooltip_surf.get_height() // 2
-                pygame.draw.rect(screen, (255, 255, 200), (tooltip_x - 5, tooltip_y - 2, tooltip_surf.get_width() + 10, tooltip_surf.get_height() + 4))
-                pygame.draw.rect(screen, BLACK, (tooltip_x - 5, tooltip_y - 2, tooltip_surf.get_width() + 10, tooltip_surf.get_height() + 4), 1)
-                screen.blit(tooltip_surf, (tooltip_x, tooltip_y))
-            y += item_h + 20
-        
+        store_layer.draw(screen)
+        draw_text(f"Money: ${sim.money}", OVERLAY_X + OVERLAY_W - 260, OVERLAY_Y + 20)
+
+        if back_button.hovered:
+            draw_button(back_button.rect, "Back", True)
+
+        # Hovered item and its tooltip
+        for item, button in store_buttons.items():
+            if button.hovered:
+                draw_button(button.rect, f"{button.label} - ${sim.prices[item]}", True)
+                draw_tooltip(button)
+
         # Show insufficient funds message
         if store_message_timer > 0:
-            msg_surf = font.render(store_message, True, (255, 50, 50))
-            msg_x = overlay_x + (overlay_w - msg_surf.get_width()) // 2
-            msg_y = overlay_y + overlay_h - 50
+            msg_surf = text_cache.render(font, store_message, (255, 50, 50))
+            msg_x = OVERLAY_X + (OVERLAY_W - msg_surf.get_width()) // 2
+            msg_y = OVERLAY_Y + OVERLAY_H - 50
             pygame.draw.rect(screen, (255, 200, 200), (msg_x - 10, msg_y - 5, msg_surf.get_width() + 20, msg_surf.get_height() + 10), border_radius=5)
             pygame.draw.rect(screen, (200, 0, 0), (msg_x - 10, msg_y - 5, msg_surf.get_width() + 20, msg_surf.get_height() + 10), 2, border_radius=5)
             screen.blit(msg_surf, (msg_x, msg_y))
         else:
             store_message = ""
-
-    pygame.display.flip()
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        if profiler.enabled:
+            profiler.lap("store")
+
+    # Finances overlay
+    if in_finances:
+        finances_layer.draw(screen, finances_key)
+        if back_button.hovered:
+            draw_button(back_button.rect, "Back", True)
+        if profiler.enabled:
+            profiler.lap("finances")
+
+    if profiler.enabled:
+        hud_layer.draw(screen, profiler.version)
+        profiler.lap("hud")
+
+    if DIRTY_RECTS:
+        dirty.present(screen)
+    else:
+        pygame.display.flip()
+    frame_presented()
+    if profiler.enabled:
+        profiler.lap("present")
+
+    return running
+
+def main():
+    global pacer, clock, recorder, exit_after_first_frame
+    parser = argparse.ArgumentParser(description="Feline Finances")
+    parser.add_argument("--record", metavar="FILE", help="record this session so replay.py can play it back")
+    parser.add_argument("--startup-time", action="store_true", help="print the time to the first frame and quit")
+    args = parser.parse_args()
+    exit_after_first_frame = args.startup_time
+
+    open_slots()  # before recording, so a recording never sees a save from before slots
+    if args.record:
+        recorder = Recorder(args.record, pacer, RECORDED_EVENTS, [slots.index_path])
+        rng.seed(recorder.seed)
+        pacer = recorder
+        clock = recorder.time
+
+    start_game()
+    ui.move(pygame.mouse.get_pos())  # hover follows motion events from here on
+    pygame.time.set_timer(DECAY_EVENT, TICK_MS)
+    pygame.time.set_timer(AUTOSAVE_EVENT, AUTOSAVE_INTERVAL)
+
+    while running:
+        # Full rate only while something moves, otherwise sleep until input or a timer
+        animating = in_chore and active_minigame is not None and active_minigame.animating
+        dt, events = pacer.wait(animating=animating, busy=store_message_timer > 0)
+        if profiler.enabled:
+            profiler.start()
+        run_frame(dt, events)
+        if profiler.enabled:
+            profiler.end()
+
+    if recorder:
+        recorder.close(sim.to_save())
+    save_writer.close()
+    ledger.close()
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
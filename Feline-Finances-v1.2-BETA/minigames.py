@@ -0,0 +1,324 @@
+# Chore minigames. Every game keeps its objects in an EntityPool (one NumPy
+# array per field, slots recycled instead of allocated) and finds them
+# through a SpatialHash, so clicks and collisions only look at the objects
+# near them and moving hundreds of objects is a few array operations.
+import numpy as np
+import pygame
+
+BLACK = (0, 0, 0)
+
+# -------------------- ENTITY POOL --------------------
+class EntityPool:
+    # Fixed number of slots stored as a struct of arrays. spawn() takes a free
+    # slot and kill() hands it back, so the arrays never grow while a game
+    # runs. step() and bounce() move every slot at once through scratch
+    # arrays made up front; dead slots move too, which is cheaper than
+    # masking them out and harmless since nothing reads them.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.w = np.zeros(capacity)
+        self.h = np.zeros(capacity)
+        self.kind = np.zeros(capacity, np.int64)
+        self.alive = np.zeros(capacity, bool)
+        self.free = list(range(capacity - 1, -1, -1))  # lowest slot on top
+        self.scratch = np.zeros(capacity)
+        self.mask = np.zeros(capacity, bool)
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def spawn(self, x, y, w, h, kind=0, vx=0.0, vy=0.0):
+        # Returns the slot, or None when the pool is full
+        if not self.free:
+            return None
+        i = self.free.pop()
+        self.x[i], self.y[i], self.w[i], self.h[i] = x, y, w, h
+        self.vx[i], self.vy[i] = vx, vy
+        self.kind[i] = kind
+        self.alive[i] = True
+        return i
+
+    def kill(self, ids):
+        # `ids` is an array of slots; ones that are already dead are skipped
+        ids = ids[self.alive[ids]]
+        self.alive[ids] = False
+        self.free.extend(ids.tolist())
+        return len(ids)
+
+    def active(self):
+        return np.flatnonzero(self.alive)
+
+    def step(self, seconds, gravity=0.0):
+        if gravity:
+            self.vy += gravity * seconds
+        self.x += np.multiply(self.vx, seconds, out=self.scratch)
+        self.y += np.multiply(self.vy, seconds, out=self.scratch)
+
+    def bounce(self, area):
+        # Keeps every slot inside `area`, reflecting its velocity off the edges
+        self.reflect(self.x, self.vx, self.w, area.left, area.right)
+        self.reflect(self.y, self.vy, self.h, area.top, area.bottom)
+
+    def reflect(self, pos, vel, size, low, high):
+        mask, scratch = self.mask, self.scratch
+        np.less(pos, low, out=mask)
+        np.copyto(pos, low, where=mask)
+        np.copyto(vel, np.abs(vel, out=scratch), where=mask)
+        np.greater(np.add(pos, size, out=scratch), high, out=mask)
+        np.copyto(pos, np.subtract(high, size, out=scratch), where=mask)
+        np.copyto(vel, np.negative(np.abs(vel, out=scratch), out=scratch), where=mask)
+
+# -------------------- SPATIAL HASH --------------------
+class SpatialHash:
+    # Uniform grid over the centres of a pool's live entities. Each slot's
+    # cell key is packed with the slot number below it into one int64 and
+    # the live ones are sorted in place, in arrays sized to the pool once,
+    # so what build() allocates does not grow with the entity count (only
+    # the sort's small fixed work buffer). Cells are at least as big as the
+    # largest entity, so anything overlapping a rectangle has its centre in
+    # that rectangle's cells or the ring around them. Within one grid column
+    # the keys are consecutive, so a query is one binary search per column.
+    # build() again after the entities move.
+    STRIDE = 1 << 20  # keys are column * STRIDE + row
+    DEAD = np.iinfo(np.int64).max  # sorts after every live slot
+
+    def __init__(self, cell, capacity):
+        self.cell = cell
+        self.shift = max(1, (capacity - 1).bit_length())
+        self.slot_bits = (1 << self.shift) - 1
+        self.slots = np.arange(capacity, dtype=np.int64)
+        self.packed = np.full(capacity, self.DEAD, np.int64)
+        self.row = np.zeros(capacity, np.int64)
+        self.centre = np.zeros(capacity)
+        self.dead = np.zeros(capacity, bool)
+        self.count = 0
+
+    def build(self, pool):
+        centre, packed = self.centre, self.packed
+        np.floor_divide(np.add(pool.x, np.multiply(pool.w, 0.5, out=centre), out=centre), self.cell, out=centre)
+        np.copyto(packed, centre, casting="unsafe")
+        np.floor_divide(np.add(pool.y, np.multiply(pool.h, 0.5, out=centre), out=centre), self.cell, out=centre)
+        np.copyto(self.row, centre, casting="unsafe")
+        packed *= self.STRIDE
+        packed += self.row
+        np.left_shift(packed, self.shift, out=packed)
+        packed |= self.slots
+        np.copyto(packed, self.DEAD, where=np.logical_not(pool.alive, out=self.dead))
+        packed.sort()
+        self.count = len(pool)
+
+    def near(self, left, top, right, bottom):
+        # Slots whose centre cell is within one cell of the rectangle
+        c = self.cell
+        row0, row1 = int(top // c) - 1, int(bottom // c) + 1
+        packed = self.packed[:self.count]
+        parts = []
+        for col in range(int(left // c) - 1, int(right // c) + 2):
+            lo = np.searchsorted(packed, (col * self.STRIDE + row0) << self.shift, "left")
+            hi = np.searchsorted(packed, (col * self.STRIDE + row1) << self.shift | self.slot_bits, "right")
+            if hi > lo:
+                parts.append(packed[lo:hi] & self.slot_bits)
+        return np.concatenate(parts) if parts else self.slots[:0]
+
+    def overlapping(self, pool, rect):
+        # Live slots whose box overlaps `rect`
+        ids = self.near(rect.left, rect.top, rect.right, rect.bottom)
+        hit = (pool.alive[ids]
+               & (pool.x[ids] < rect.right) & (pool.x[ids] + pool.w[ids] > rect.left)
+               & (pool.y[ids] < rect.bottom) & (pool.y[ids] + pool.h[ids] > rect.top))
+        return ids[hit]
+
+    def top(self, pool, pos):
+        # The live slot drawn on top at `pos` (the highest one), or None
+        ids = self.overlapping(pool, pygame.Rect(pos, (1, 1)))
+        return int(ids.max()) if len(ids) else None
+
+def make_sprite(size, color):
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    rect = surface.get_rect()
+    pygame.draw.rect(surface, color, rect, border_radius=5)
+    pygame.draw.rect(surface, BLACK, rect, 2, border_radius=5)
+    return surface
+
+# -------------------- MINIGAME --------------------
+class Minigame:
+    # A game is set up in its constructor, then update(dt, pointer) runs every
+    # frame (dt in ms, pointer the last known mouse position or None),
+    # click(pos) for every click in the play area and draw(surface) whenever
+    # the overlay is redrawn. `done` turns True once the chore is finished,
+    # `version` changes whenever the picture does and `animating` asks the
+    # frame pacer for full-rate frames.
+    title = ""
+    chore_id = ""
+    animating = True
+    KINDS = []  # (width, height, color) per entity kind
+    MAX_STEP = 50  # ms; longer gaps (the window was idle) are not simulated
+
+    def __init__(self, area, rng, capacity, cell):
+        self.area = pygame.Rect(area)
+        self.rng = rng
+        self.pool = EntityPool(capacity)
+        self.grid = SpatialHash(cell, capacity)
+        self.sprites = [make_sprite((w, h), color) for w, h, color in self.KINDS]
+        self.done = False
+        self.version = 0
+
+    def spawn(self, x, y, kind, vx=0.0, vy=0.0):
+        w, h, _ = self.KINDS[kind]
+        return self.pool.spawn(x, y, w, h, kind, vx, vy)
+
+    def update(self, dt, pointer):
+        pass
+
+    def click(self, pos):
+        pass
+
+    def status(self):
+        return ""
+
+    def draw(self, surface):
+        # blits() takes a list of (sprite, position) pairs, so this one is
+        # built fresh each frame
+        pool = self.pool
+        ids = pool.active()
+        sprites = self.sprites
+        surface.blits([
+            (sprites[kind], (x, y))
+            for kind, x, y in zip(pool.kind[ids].tolist(), pool.x[ids].astype(int).tolist(), pool.y[ids].astype(int).tolist())
+        ], doreturn=False)
+
+# -------------------- TAKE OUT THE TRASH --------------------
+class TrashGame(Minigame):
+    # Five bags lying around, click each one to take it out
+    title = "Take Out The Trash"
+    chore_id = "trash"
+    animating = False
+    KINDS = [(30, 30, (139, 90, 43))]
+    BAGS = 5
+
+    def __init__(self, area, rng):
+        super().__init__(area, rng, self.BAGS, 32)
+        for _ in range(self.BAGS):
+            x = self.area.x + 60 + rng.randint(0, self.area.width - 120)
+            y = self.area.y + 20 + rng.randint(0, self.area.height - 80)
+            self.spawn(x, y, 0)
+        self.grid.build(self.pool)  # bags never move
+        self.collected = 0
+
+    def click(self, pos):
+        i = self.grid.top(self.pool, pos)
+        if i is None:
+            return False
+        self.pool.kill(np.array([i]))
+        self.collected += 1
+        self.done = self.collected == self.BAGS
+        self.version += 1
+        return True
+
+    def status(self):
+        return f"Trash: {self.collected}/{self.BAGS} Collected"
+
+# -------------------- PUT AWAY LAUNDRY --------------------
+class LaundryGame(Minigame):
+    # Clean laundry tumbling around the room, click a piece to put it away
+    title = "Put Away Laundry"
+    chore_id = "laundry"
+    KINDS = [(36, 28, (90, 140, 220)), (18, 24, (240, 240, 230)), (42, 30, (240, 150, 190))]  # shirt, sock, towel
+
+    def __init__(self, area, rng, count=20):
+        super().__init__(area, rng, count, 48)
+        for _ in range(count):
+            kind = rng.randrange(len(self.KINDS))
+            w, h, _ = self.KINDS[kind]
+            x = self.area.x + rng.uniform(0, self.area.width - w)
+            y = self.area.y + rng.uniform(0, self.area.height - h)
+            self.spawn(x, y, kind, rng.uniform(-140, 140), rng.uniform(-140, 140))
+        self.count = count
+        self.put_away = 0
+
+    def update(self, dt, pointer):
+        self.pool.step(min(dt, self.MAX_STEP) / 1000)
+        self.pool.bounce(self.area)
+        self.grid.build(self.pool)
+        self.version += 1
+
+    def click(self, pos):
+        i = self.grid.top(self.pool, pos)
+        if i is None:
+            return False
+        self.pool.kill(np.array([i]))
+        self.put_away += 1
+        self.done = self.put_away == self.count
+        return True
+
+    def status(self):
+        return f"Laundry: {self.put_away}/{self.count} Put Away"
+
+# -------------------- STOVE TOP SIZZLER --------------------
+class StovetopGame(Minigame):
+    # Pans on the stove spit grease; hold the lid (it follows the mouse) in
+    # the way to catch the drops before they land
+    title = "Stove Top Sizzler"
+    chore_id = "stovetop"
+    KINDS = [(7, 7, (250, 200, 60)), (5, 5, (255, 140, 40))]
+    GRAVITY = 900  # px/s^2
+    LID = (100, 12)
+    PAN = (110, 22)
+
+    def __init__(self, area, rng, rate=90, goal=120, capacity=512):
+        super().__init__(area, rng, capacity, 16)
+        self.rate = rate  # drops per second from all pans together
+        self.goal = goal
+        self.caught = 0
+        self.owed = 0.0  # drops due but not spawned yet
+        pan_y = self.area.bottom - self.PAN[1] - 10
+        self.pans = [
+            pygame.Rect(self.area.x + self.area.width * i // 4 - self.PAN[0] // 2, pan_y, *self.PAN)
+            for i in (1, 2, 3)
+        ]
+        self.lid = None
+
+    def update(self, dt, pointer):
+        seconds = min(dt, self.MAX_STEP) / 1000
+        rng = self.rng
+        self.owed += self.rate * seconds
+        while self.owed >= 1:
+            self.owed -= 1
+            pan = rng.choice(self.pans)
+            self.spawn(pan.centerx + rng.uniform(-40, 40), pan.top - 6, rng.randrange(len(self.KINDS)),
+                       rng.uniform(-120, 120), rng.uniform(-560, -320))
+
+        pool = self.pool
+        pool.step(seconds, self.GRAVITY)
+        # Drops that fell back onto the stove or left the room are gone
+        pool.kill(np.flatnonzero(pool.alive & ((pool.y > self.pans[0].top + 4)
+                                               | (pool.x < self.area.left) | (pool.x > self.area.right))))
+        self.grid.build(pool)
+
+        self.lid = None
+        if pointer is not None and self.area.collidepoint(pointer):
+            self.lid = pygame.Rect((0, 0), self.LID)
+            self.lid.center = pointer
+            self.lid.clamp_ip(self.area)
+            self.caught += pool.kill(self.grid.overlapping(pool, self.lid))
+            self.done = self.caught >= self.goal
+        self.version += 1
+
+    def status(self):
+        return f"Grease caught: {min(self.caught, self.goal)}/{self.goal}"
+
+    def draw(self, surface):
+        for pan in self.pans:
+            pygame.draw.rect(surface, (70, 70, 80), pan, border_radius=6)
+            pygame.draw.rect(surface, BLACK, pan, 2, border_radius=6)
+        super().draw(surface)
+        if self.lid is not None:
+            pygame.draw.rect(surface, (150, 150, 160), self.lid, border_radius=4)
+            pygame.draw.rect(surface, BLACK, self.lid, 2, border_radius=4)
+            pygame.draw.rect(surface, BLACK, (self.lid.centerx - 8, self.lid.top - 6, 16, 6), border_radius=2)
+
+MINIGAMES = {game.chore_id: game for game in (TrashGame, LaundryGame, StovetopGame)}
@@ -0,0 +1,47 @@
+import pygame
+
+# Events that count as the player doing something
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL)
+
+# -------------------- FRAME PACER --------------------
+class FramePacer:
+    # Decides how long the loop sleeps before the next frame:
+    #   active - something is animating or the player just gave input: full rate
+    #   low    - a static screen still has something counting down: low rate
+    #   idle   - nothing is due: block in event.wait until an event (input or
+    #            a set_timer event) arrives, or idle_timeout passes
+    def __init__(self, active_fps=60, low_fps=10, idle_timeout=1000, linger=250):
+        self.active_fps = active_fps
+        self.low_fps = low_fps
+        self.idle_timeout = idle_timeout
+        self.linger = linger  # ms to stay at full rate after input
+        self.clock = pygame.time.Clock()
+        self.last_input = -linger
+        self.last_frame = pygame.time.get_ticks()
+        self.mode = "active"
+
+    def wait(self, animating=False, busy=False):
+        if animating or pygame.time.get_ticks() - self.last_input < self.linger:
+            self.mode = "active"
+            self.clock.tick(self.active_fps)
+            events = pygame.event.get()
+        elif busy:
+            self.mode = "low"
+            self.clock.tick(self.low_fps)
+            events = pygame.event.get()
+        else:
+            self.mode = "idle"
+            event = pygame.event.wait(self.idle_timeout)
+            events = [] if event.type == pygame.NOEVENT else [event]
+            events += pygame.event.get()
+
+        now = pygame.time.get_ticks()
+        if any(e.type in INPUT_EVENTS for e in events):
+            self.last_input = now
+        dt = now - self.last_frame
+        self.last_frame = now
+        return dt, events
+
+    def pause(self, ms):
+        # Holds the loop, e.g. so a click sound plays out before a screen change
+        pygame.time.delay(ms)
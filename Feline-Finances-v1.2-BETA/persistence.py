@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+
+# -------------------- LOADING --------------------
+def load_save(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+# -------------------- SAVE WRITER --------------------
+class SaveWriter:
+    # Writes saves on a background thread so the render loop never waits on
+    # the disk. save() only hands over a snapshot; if several arrive before
+    # the thread gets to them, only the newest one is written. Each write
+    # goes to a temp file that is fsynced and then renamed over the save,
+    # so a crash mid-write leaves the previous save intact. After a write,
+    # on_write(data, extra) runs on the same thread with whatever was passed
+    # to save() alongside the data. A failed write or hook is kept in
+    # `error` and the thread carries on with the next save.
+    def __init__(self, path, on_write=None):
+        self.path = path
+        self.on_write = on_write
+        self.pending = None
+        self.last_written = None
+        self.writes = 0
+        self.error = None
+        self.closed = False
+        self.wake = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name="save-writer", daemon=True)
+        self.thread.start()
+
+    def save(self, data, extra=None):
+        with self.wake:
+            self.pending = (data, extra)
+            self.wake.notify()
+
+    def close(self):
+        # Flush whatever is still pending, then stop the thread
+        with self.wake:
+            self.closed = True
+            self.wake.notify()
+        self.thread.join()
+
+    def run(self):
+        while True:
+            with self.wake:
+                while self.pending is None and not self.closed:
+                    self.wake.wait()
+                pending, self.pending = self.pending, None
+                if pending is None and self.closed:
+                    return
+            self.write(*pending)
+
+    def write(self, data, extra=None):
+        # The timestamp changes every time, so leave it out of the comparison
+        content = {k: v for k, v in data.items() if k != "saved_at"}
+        if content == self.last_written:
+            return
+
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:  # a full disk, or data json can't encode
+            self.error = e
+            return
+        self.last_written = content
+        self.writes += 1
+        if self.on_write is not None:
+            try:
+                self.on_write(data, extra)
+            except Exception as e:
+                self.error = e
+
+# -------------------- SAVE SLOTS --------------------
+def summarize(data):
+    # What the profile picker shows for a save
+    return {
+        "name": data["name"],
+        "cat_type": data["type"],
+        "personality": data["personality"],
+        "money": data["money"],
+        "last_played": data.get("saved_at"),
+        "thumbnail": None
+    }
+
+class SaveSlots:
+    # One folder per save slot under `folder`, each holding its own save and
+    # ledger files, plus index.json with a short summary of every slot. The
+    # profile picker only ever reads the index; a slot's files are opened
+    # once it is picked. The index is rewritten whenever a slot's save is,
+    # and rebuilt from the slot folders if it goes missing.
+    INDEX_FILE = "index.json"
+    FORMAT = 1
+
+    def __init__(self, folder, save_file, thumbnail_file=None):
+        self.folder = folder
+        self.save_file = save_file  # file names inside a slot folder
+        self.thumbnail_file = thumbnail_file
+        self.index_path = os.path.join(folder, self.INDEX_FILE)
+        self.lock = threading.Lock()  # record() runs on save writer threads
+        self.summaries = self.load()  # slot -> summary
+
+    def load(self):
+        try:
+            data = load_save(self.index_path)
+        except ValueError:
+            data = None
+        if data is not None and data.get("format") == self.FORMAT:
+            return data["slots"]
+        summaries = self.rebuild()
+        if summaries:
+            try:
+                self.write_index(summaries)
+            except OSError:
+                pass  # rebuilt again next launch
+        return summaries
+
+    def rebuild(self):
+        summaries = {}
+        try:
+            slots = sorted(os.listdir(self.folder))
+        except OSError:
+            return summaries
+        for slot in slots:
+            try:
+                data = load_save(self.path(slot, self.save_file))
+            except (OSError, ValueError):
+                continue
+            if data is not None:
+                summaries[slot] = summarize(data)
+                if self.thumbnail_file and os.path.exists(self.path(slot, self.thumbnail_file)):
+                    summaries[slot]["thumbnail"] = self.thumbnail_file
+        return summaries
+
+    def write_index(self, summaries):
+        # Not fsynced: a lost index is rebuilt from the saves
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"format": self.FORMAT, "slots": summaries}, f, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def path(self, slot, name):
+        return os.path.join(self.folder, slot, name)
+
+    def list(self):
+        # (slot, summary) pairs, most recently played first
+        return sorted(self.summaries.items(), key=lambda item: -(item[1]["last_played"] or 0))
+
+    def create(self):
+        # Folder for a new slot; it shows up in the index once it is saved
+        number = 1
+        while f"slot{number}" in self.summaries or os.path.exists(os.path.join(self.folder, f"slot{number}")):
+            number += 1
+        slot = f"slot{number}"
+        os.makedirs(os.path.join(self.folder, slot))
+        return slot
+
+    def record(self, slot, data, thumbnail=None):
+        # Updates the slot's summary after its save was written. `thumbnail`
+        # is the name of an image file in the slot folder, if a new one was
+        # written; otherwise the old one is kept.
+        with self.lock:
+            summary = summarize(data)
+            summary["thumbnail"] = thumbnail or self.summaries.get(slot, {}).get("thumbnail")
+            self.summaries[slot] = summary
+            try:
+                self.write_index(dict(self.summaries))
+            except OSError:
+                pass  # the summary catches up on the slot's next save
+
+    def adopt(self, save_path, others=()):
+        # Moves a save from before there were slots, and the files that go
+        # with it, into a new slot. Returns the slot, or None if there was
+        # no such save.
+        data = load_save(save_path)
+        if data is None:
+            return None
+        slot = self.create()
+        os.replace(save_path, self.path(slot, self.save_file))
+        for path in others:
+            if os.path.exists(path):
+                os.replace(path, self.path(slot, os.path.basename(path)))
+        self.record(slot, data)
+        return slot
@@ -0,0 +1,87 @@
+import csv
+import time
+from collections import deque
+from itertools import islice
+
+# -------------------- FRAME PROFILER --------------------
+class Profiler:
+    # Splits each frame into named sections. The loop calls start() when a
+    # frame begins, lap(name) after each section (the time since the previous
+    # lap is charged to that section, so a section can be lapped several
+    # times a frame) and end() when the frame is done. Whatever was not
+    # lapped ends up in "other".
+    # Callers check `enabled` before calling in, so while the profiler is off
+    # each section costs one attribute lookup and nothing is recorded.
+    def __init__(self, sections, window=120, history=3600, refresh=250):
+        self.sections = list(sections) + ["other"]
+        self.window = window  # frames in the rolling averages
+        self.refresh = refresh / 1000  # seconds between report updates
+        self.frames = deque(maxlen=history)  # (start, total, *sections) per frame
+        self.enabled = False
+        self.current = None
+        self.report = []
+        self.note = ""
+        self.version = 0
+        self.published = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.frames.clear()
+            self.report = []
+            self.note = ""
+            self.published = time.perf_counter()
+            self.version += 1
+            self.start()
+        else:
+            self.current = None
+
+    def start(self):
+        self.frame_start = self.last = time.perf_counter()
+        self.current = dict.fromkeys(self.sections, 0.0)
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.current[name] += now - self.last
+        self.last = now
+
+    def end(self):
+        if self.current is None:
+            return
+        now = time.perf_counter()
+        self.current["other"] += now - self.last
+        self.frames.append((self.frame_start, now - self.frame_start, *self.current.values()))
+        self.current = None
+        if now - self.published >= self.refresh:
+            self.publish(now)
+
+    def publish(self, now):
+        # Rolling average and worst frame (in ms) per section over the window
+        recent = list(islice(reversed(self.frames), self.window))
+        if not recent:
+            return
+        report = []
+        for i, name in enumerate(self.sections + ["total"]):
+            column = 2 + i if name != "total" else 1
+            values = [frame[column] for frame in recent]
+            report.append((name, sum(values) / len(values) * 1000, max(values) * 1000))
+        self.report = report
+        self.published = now
+        self.version += 1
+
+    def dump_csv(self, path):
+        # Every recorded frame, oldest first, times in ms
+        origin = self.frames[0][0] if self.frames else 0.0
+        try:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame", "time_ms", "total_ms"] + [f"{name}_ms" for name in self.sections])
+                for i, frame in enumerate(self.frames):
+                    writer.writerow([i, f"{(frame[0] - origin) * 1000:.3f}"] + [f"{value * 1000:.4f}" for value in frame[1:]])
+        except OSError as e:
+            self.note = f"CSV export failed: {e.strerror}"
+            self.version += 1
+            return False
+        self.note = f"Saved {path}"
+        self.version += 1
+        return True
@@ -0,0 +1,147 @@
+import gzip
+import json
+import os
+import random
+import time
+import zlib
+
+import pygame
+
+FORMAT = 1
+FLUSH_EVERY = 120  # frames between flushes, so a crash loses at most ~2s
+
+# -------------------- RECORDER --------------------
+class Recorder:
+    # Wraps the frame pacer and writes every frame's dt and the events the
+    # game reacts to into a gzipped JSON-lines file:
+    #   header  {"format", "seed", "started_at", "files"}
+    #   frames  [dt, [name, *attrs], ...]
+    #   files   {"files": {path: text}}   (from capture(), between frames)
+    #   footer  {"end": final state}   (missing if the game crashed)
+    # `files` holds the save/ledger files the session started from, so a
+    # replay starts from exactly the same state. Files the game only opens
+    # later (a save slot once it is picked) are added with capture() right
+    # before they are read. The game's random numbers
+    # come from `seed` and its clock from time(), which only advances with
+    # the recorded dt.
+    def __init__(self, path, pacer, events, files):
+        self.pacer = pacer
+        self.events = events  # name -> (event type, attribute names)
+        self.names = {event_type: name for name, (event_type, attrs) in events.items()}
+        self.seed = random.randrange(2 ** 32)
+        self.started_at = time.time()
+        self.elapsed = 0
+        self.frames = 0
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.write({
+            "format": FORMAT,
+            "seed": self.seed,
+            "started_at": self.started_at,
+            "files": {name: read_text(name) for name in files}
+        })
+
+    def write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def capture(self, files):
+        self.write({"files": {name: read_text(name) for name in files}})
+
+    def time(self):
+        return self.started_at + self.elapsed / 1000
+
+    def wait(self, animating=False, busy=False):
+        dt, events = self.pacer.wait(animating=animating, busy=busy)
+        frame = [dt]
+        for event in events:
+            name = self.names.get(event.type)
+            if name is not None:
+                frame.append([name] + [getattr(event, attr) for attr in self.events[name][1]])
+        self.write(frame)
+        self.elapsed += dt
+        self.frames += 1
+        if self.frames % FLUSH_EVERY == 0:
+            self.file.flush()
+        return dt, events
+
+    def pause(self, ms):
+        self.pacer.pause(ms)
+
+    def close(self, state=None):
+        if state is not None:
+            self.write({"end": state})
+        self.file.close()
+
+def read_text(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+# -------------------- REPLAY --------------------
+class Replay:
+    # Reads a recording back and stands in for the frame pacer: wait() hands
+    # out the recorded frames without sleeping, then a QUIT once they run out.
+    # A recording cut short by a crash replays up to its last complete frame.
+    def __init__(self, path, events):
+        self.events = events
+        self.frames = []
+        self.files = {}
+        self.end = None
+        self.index = 0
+        self.elapsed = 0
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != FORMAT:
+                raise ValueError(f"Unsupported recording format: {header.get('format')}")
+            try:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    record = json.loads(line)
+                    if isinstance(record, dict):
+                        self.files.update(record.get("files", {}))
+                        self.end = record.get("end", self.end)
+                    else:
+                        self.frames.append(self.decode(record))
+            except (EOFError, zlib.error):
+                pass
+        self.seed = header["seed"]
+        self.started_at = header["started_at"]
+        self.files = dict(header["files"], **self.files)
+
+    def decode(self, frame):
+        events = []
+        for name, *values in frame[1:]:
+            event_type, attrs = self.events[name]
+            attributes = dict(zip(attrs, values))
+            if "pos" in attributes:
+                attributes["pos"] = tuple(attributes["pos"])
+            events.append(pygame.event.Event(event_type, attributes))
+        return frame[0], events
+
+    def restore(self, folder):
+        # Writes the files the session started from into `folder`, including
+        # the ones it only captured later (nothing wrote to them before that)
+        for name, text in self.files.items():
+            if text is not None:
+                path = os.path.join(folder, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8", newline="") as f:
+                    f.write(text)
+
+    def done(self):
+        return self.index >= len(self.frames)
+
+    def time(self):
+        return self.started_at + self.elapsed / 1000
+
+    def wait(self, animating=False, busy=False):
+        if self.done():
+            return 0, [pygame.event.Event(pygame.QUIT)]
+        dt, events = self.frames[self.index]
+        self.index += 1
+        self.elapsed += dt
+        return dt, events
+
+    def pause(self, ms):
+        pass
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+
+import pygame
+
+_UNSET = object()
+
+# -------------------- DIRTY RECTANGLES --------------------
+class DirtyRegions:
+    # Remembers what was last drawn into each screen region so a frame only
+    # repaints (and pushes to the display) the regions whose content changed.
+    def __init__(self, size):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.states = {}
+        self.rects = []
+        self.full = True
+
+    def track(self, key, rect, state):
+        if self.states.get(key, _UNSET) != state:
+            self.states[key] = state
+            self.rects.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        self.full = True
+
+    def pending(self):
+        return self.full or bool(self.rects)
+
+    def begin(self, surface):
+        # Clip drawing to the changed area so untouched pixels are left alone
+        if self.full:
+            surface.set_clip(None)
+        else:
+            surface.set_clip(self.rects[0].unionall(self.rects[1:]))
+
+    def present(self, surface):
+        surface.set_clip(None)
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.rects)
+        self.rects = []
+        self.full = False
+
+# -------------------- TEXT CACHE --------------------
+class TextCache:
+    # Least-recently-used cache of rendered text surfaces. Labels are mostly
+    # the same strings every frame, so glyphs only get rasterized on a miss.
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, f, text, color, antialias=True):
+        key = (f, text, tuple(color), antialias)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = f.render(text, antialias, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+# -------------------- LAYERS --------------------
+class Layer:
+    # Offscreen surface for a part of the screen that rarely changes. The
+    # owner passes a key describing the content, and the surface is only
+    # rebuilt (by the build callback, or by capturing the screen) when the
+    # key changes. The surface itself is allocated once and reused.
+    def __init__(self, rect, build=None, alpha=False):
+        self.rect = pygame.Rect(rect)
+        self.build = build
+        self.alpha = alpha
+        self.surface = None
+        self.key = _UNSET
+
+    def stale(self, key=None):
+        return self.surface is None or self.key != key
+
+    def allocate(self):
+        if self.surface is None:
+            if self.alpha:
+                self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA).convert_alpha()
+            else:
+                self.surface = pygame.Surface(self.rect.size).convert()
+        elif self.alpha:
+            self.surface.fill((0, 0, 0, 0))
+        return self.surface
+
+    def draw(self, target, key=None):
+        if self.stale(key):
+            self.build(self.allocate())
+            self.key = key
+        target.blit(self.surface, self.rect)
+
+    def capture(self, source, key=None):
+        self.allocate().blit(source, (0, 0), self.rect)
+        self.key = key
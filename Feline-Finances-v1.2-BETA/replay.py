@@ -0,0 +1,76 @@
+# Plays a recorded session back headless and with no frame cap, then checks
+# that it ended in the same state as when it was recorded.
+#
+#   python main.py --record session.rec.gz   play and record
+#   python replay.py session.rec.gz          replay, exits non-zero on a mismatch
+#
+# The replay runs in a temporary folder seeded with the slot index and the
+# save and ledger files the session started from, so the real saves are never
+# touched. Run it from this folder, like main.py, so the assets are found.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import main as game
+from recording import Replay
+
+def differences(expected, actual, prefix=""):
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            yield from differences(expected.get(key), actual.get(key), f"{prefix}{key}.")
+    elif expected != actual:
+        yield f"{prefix.rstrip('.')}: recorded {expected!r}, replayed {actual!r}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session headless")
+    parser.add_argument("recording", help="file written by main.py --record")
+    args = parser.parse_args()
+
+    replay = Replay(args.recording, game.RECORDED_EVENTS)
+    game.rng.seed(replay.seed)
+    game.pacer = replay
+    game.clock = replay.time
+
+    home = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="feline-replay-") as folder:
+        replay.restore(folder)
+        os.chdir(folder)
+        start = time.perf_counter()
+        try:
+            game.start_game()
+            while game.running:
+                dt, events = replay.wait()
+                game.run_frame(dt, events)
+        except SystemExit:
+            pass  # quit on the setup screen
+        elapsed = time.perf_counter() - start
+
+        state = json.loads(json.dumps(game.sim.to_save())) if game.sim else None
+        if game.save_writer:
+            game.save_writer.close()
+        if game.ledger:
+            game.ledger.close()
+        os.chdir(home)
+    pygame.quit()
+
+    print(f"Replayed {replay.index} frames ({replay.elapsed / 1000:.1f} s of play) in {elapsed * 1000:.1f} ms")
+    if replay.end is None:
+        print("Recording has no end state (the game did not exit normally), nothing to compare")
+        return 0
+    mismatches = list(differences(replay.end, state))
+    for line in mismatches:
+        print(f"MISMATCH {line}")
+    if not mismatches:
+        print("End state matches the recording")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+# Headless game simulation: the cat, its stat decay and the economy.
+# Nothing in here touches pygame, so it can run without a window and at
+# any speed (tests, tools, fast-forwarding).
+import numpy as np
+
+# -------------------- SIMULATION SETTINGS --------------------
+TICK_MS = 5000  # game time between two stat decays
+STARTING_MONEY = 50
+STORE_PRICES = {"Meowmunch": 5, "Purrplay": 10, "Furbath": 15}
+CHORE_PAYOUTS = {"trash": 5, "laundry": 8, "stovetop": 10}
+DECAY_RATES = {"hunger": 2, "happiness": 1, "energy": 1, "cleanliness": 1}  # per tick
+
+# Stats that decay each tick; health is their average
+DECAYING_STATS = ("hunger", "happiness", "energy", "cleanliness")
+MOODS = ("Happy", "Sick", "Sad", "Energetic")
+HEALTH_WEIGHTS = np.full((1, len(DECAYING_STATS)), 1 / len(DECAYING_STATS))
+
+# -------------------- HOUSEHOLD --------------------
+class Household:
+    # Stats of every cat in a household stored as a struct of arrays: one
+    # NumPy array per stat, one row (index) per cat. Decay, health and mood
+    # run as array operations over all cats at once, so a tick costs about
+    # the same for one cat as for thousands. Cat objects are views onto a row.
+    # The four decaying stat arrays are stacked in one 2D block, so a tick is
+    # a handful of operations; self.hunger etc. are views into the block.
+    # Stats and decay rates are floats, so fractional values (a tuned rate
+    # of 1.5) are kept rather than truncated. `version` goes up on every
+    # change, so mood_counts() is only worked out again after one.
+    def __init__(self, capacity=8):
+        self.cats = []  # view for each row
+        self.rates = None  # last decay rates and the column built from them
+        self.version = 0
+        self.counted = None  # (version, mood counts)
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        count = len(self.cats)
+        block = np.zeros((len(DECAYING_STATS), capacity), np.float64)
+        health = np.zeros(capacity, np.float64)
+        if count:
+            block[:, :count] = self.block[:, :count]
+            health[:count] = self.health[:count]
+        self.block = block
+        self.health = health
+        self.hunger, self.happiness, self.energy, self.cleanliness = block
+
+    def __len__(self):
+        return len(self.cats)
+
+    def __iter__(self):
+        return iter(self.cats)
+
+    def columns(self):
+        return [getattr(self, stat) for stat in DECAYING_STATS] + [self.health]
+
+    def decaying_stats(self, row):
+        # One cat's decaying stats as a list, in DECAYING_STATS order
+        return self.block[:, row].tolist()
+
+    def append(self, cat, stats=None):
+        # New row for `cat`, at full stats unless `stats` (a row) is given
+        row = len(self.cats)
+        if row == len(self.health):
+            self.allocate(2 * row)
+        for column, value in zip(self.columns(), stats or (100,) * 5):
+            column[row] = value
+        self.cats.append(cat)
+        self.version += 1
+        return row
+
+    def adopt(self, cat):
+        # Moves `cat` and its stats over from its current household
+        if cat.household is self:
+            return cat
+        old = cat.household
+        stats = [column[cat.row] for column in old.columns()]
+        old.remove(cat)
+        cat.household = self
+        cat.row = self.append(cat, stats)
+        return cat
+
+    def remove(self, cat):
+        # The last row moves into the gap, so rows stay packed
+        row, last = cat.row, len(self.cats) - 1
+        if row != last:
+            for column in self.columns():
+                column[row] = column[last]
+            moved = self.cats[last]
+            moved.row = row
+            self.cats[row] = moved
+        self.cats.pop()
+        self.version += 1
+
+    def decay(self, ticks=1, rates=DECAY_RATES):
+        # Same result as decaying `ticks` times in a row, since every stat
+        # just drops linearly until it bottoms out at 0
+        key = tuple(rates[stat] for stat in DECAYING_STATS)
+        if self.rates is None or self.rates[0] != key:
+            self.rates = (key, np.array(key, np.float64).reshape(-1, 1))
+        block = self.block[:, :len(self.cats)]
+        np.subtract(block, self.rates[1] * ticks, out=block)
+        np.maximum(block, 0, out=block)
+        self.update_health()
+
+    def update_health(self):
+        # Average of the decaying stats, as one (1 x 4) @ (4 x cats) product
+        count = len(self.cats)
+        np.matmul(HEALTH_WEIGHTS, self.block[:, :count], out=self.health[:count].reshape(1, count))
+        self.version += 1
+
+    def moods(self):
+        # Index into MOODS for every cat, same rules as get_mood()
+        count = len(self.cats)
+        return np.select(
+            [self.health[:count] < 40, self.happiness[:count] < 40, self.energy[:count] > 80],
+            [1, 2, 3],
+            0
+        )
+
+    def mood_counts(self):
+        if self.counted is None or self.counted[0] != self.version:
+            counts = np.bincount(self.moods(), minlength=len(MOODS))
+            self.counted = (self.version, dict(zip(MOODS, counts.tolist())))
+        return self.counted[1]
+
+# -------------------- CAT CLASS --------------------
+def stat(name):
+    # Property for one household stat array seen through the cat's row
+    def get(cat):
+        return getattr(cat.household, name).item(cat.row)
+
+    def set(cat, value):
+        getattr(cat.household, name)[cat.row] = value
+        cat.household.version += 1
+
+    return property(get, set)
+
+class Cat:
+    # A view onto one row of a Household. A cat created without one gets a
+    # household of its own, which Household.adopt() can move it out of.
+    __slots__ = ("name", "cat_type", "personality", "household", "row")
+
+    hunger = stat("hunger")
+    happiness = stat("happiness")
+    energy = stat("energy")
+    cleanliness = stat("cleanliness")
+    health = stat("health")
+
+    def __init__(self, name, cat_type, personality, household=None):
+        self.name = name
+        self.cat_type = cat_type
+        self.personality = personality
+        self.household = Household(1) if household is None else household
+        self.row = self.household.append(self)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "cat_type": self.cat_type,
+            "personality": self.personality,
+            "hunger": self.hunger,
+            "happiness": self.happiness,
+            "energy": self.energy,
+            "cleanliness": self.cleanliness,
+            "health": self.health
+        }
+
+    def feed(self):
+        self.hunger = min(100, self.hunger + 20)
+
+    def play(self):
+        self.happiness = min(100, self.happiness + 20)
+        self.energy = max(0, self.energy - 5)
+        self.update_health()
+
+    def rest(self):
+        self.energy = min(100, self.energy + 30)
+        self.happiness = min(100, self.happiness + 5)
+        self.update_health()
+
+    def clean(self):
+        self.cleanliness = min(100, self.cleanliness + 30)
+        self.happiness = min(100, self.happiness + 5)
+        self.update_health()
+
+    def update_health(self):
+        self.health = (self.hunger + self.happiness + self.energy + self.cleanliness) / 4
+
+def get_mood(cat):
+    if cat.health < 40:
+        return "Sick"
+    elif cat.happiness < 40:
+        return "Sad"
+    elif cat.energy > 80:
+        return "Energetic"
+    return "Happy"
+
+# -------------------- SIMULATION --------------------
+class Simulation:
+    # Game state advanced with a fixed timestep. advance() takes real
+    # milliseconds, scales them by time_scale and runs as many whole ticks
+    # as fit; the remainder is kept for the next call instead of dropped.
+    def __init__(self, cat, money=STARTING_MONEY, total_spent=0, inventory=None, time_scale=1.0):
+        self.cat = cat  # the cat on screen, which care actions go to
+        self.household = cat.household
+        self.money = money
+        self.total_spent = total_spent
+        self.inventory = {} if inventory is None else inventory
+        # Balance knobs, copied so a tool can tune them per simulation
+        self.prices = dict(STORE_PRICES)
+        self.payouts = dict(CHORE_PAYOUTS)
+        self.decay_rates = dict(DECAY_RATES)
+        self.time_scale = time_scale
+        self.accumulator = 0
+        self.elapsed = 0  # simulated game time in ms
+        # Called with every money/inventory transaction (ledger, analytics)
+        self.listeners = []
+
+    @classmethod
+    def from_save(cls, data):
+        cat = Cat(data["name"], data["type"], data["personality"])
+        for k, v in data["stats"].items():
+            setattr(cat, k, v)
+        for stats in data.get("housemates", []):
+            housemate = Cat(stats["name"], stats["cat_type"], stats["personality"], cat.household)
+            for k, v in stats.items():
+                setattr(housemate, k, v)
+        sim = cls(cat, data["money"], data["total_spent"], data["inventory"])
+        sim.cat = cat.household.cats[data.get("selected", 0)]
+        return sim
+
+    def to_save(self):
+        # The first cat names the save; the others are its housemates
+        first = self.household.cats[0]
+        return {
+            "name": first.name,
+            "type": first.cat_type,
+            "personality": first.personality,
+            "stats": first.stats(),
+            "housemates": [cat.stats() for cat in self.household if cat is not first],
+            "selected": self.cat.row,
+            "money": self.money,
+            "total_spent": self.total_spent,
+            "inventory": dict(self.inventory)
+        }
+
+    # ---- time ----
+    def step(self):
+        # One fixed tick of game time
+        self.household.decay(1, self.decay_rates)
+        self.elapsed += TICK_MS
+
+    def advance(self, ms):
+        self.accumulator += ms * self.time_scale
+        ticks = 0
+        while self.accumulator >= TICK_MS:
+            self.accumulator -= TICK_MS
+            self.step()
+            ticks += 1
+        return ticks
+
+    def catch_up(self, ms):
+        # Apply time that passed while the game was closed in O(1), no
+        # matter how long the player was away. Runs in real time, so
+        # time_scale does not apply.
+        total = self.accumulator + max(0, ms)
+        ticks = int(total // TICK_MS)
+        self.accumulator = total - ticks * TICK_MS
+        if ticks:
+            self.household.decay(ticks, self.decay_rates)
+            self.elapsed += ticks * TICK_MS
+        return ticks
+
+    def adopt(self, cat):
+        # Brings another cat into the household; it decays with the others
+        return self.household.adopt(cat)
+
+    def next_cat(self):
+        # Puts the next cat in the household on screen, wrapping around
+        self.cat = self.household.cats[(self.cat.row + 1) % len(self.household)]
+        return self.cat
+
+    # ---- economy ----
+    def record(self, kind, item, amount):
+        tx = {"kind": kind, "item": item, "amount": amount, "elapsed": self.elapsed}
+        for listener in self.listeners:
+            listener(tx)
+
+    def can_afford(self, item):
+        return self.money >= self.prices[item]
+
+    def buy(self, item):
+        price = self.prices[item]
+        if self.money < price:
+            return False
+        self.money -= price
+        self.total_spent += price
+        self.inventory[item] = self.inventory.get(item, 0) + 1
+        self.record("purchase", item, -price)
+        return True
+
+    def use_item(self, item):
+        if self.inventory.get(item, 0) <= 0:
+            return False
+        self.inventory[item] -= 1
+        self.record("use", item, 0)
+        return True
+
+    def complete_chore(self, chore_id):
+        payout = self.payouts.get(chore_id, 0)
+        self.money += payout
+        self.record("chore", chore_id, payout)
+
+    # ---- care actions ----
+    def feed(self):
+        if not self.use_item("Meowmunch"):
+            return False
+        self.cat.feed()
+        return True
+
+    def play(self):
+        if not self.use_item("Purrplay"):
+            return False
+        self.cat.play()
+        return True
+
+    def clean(self):
+        if not self.use_item("Furbath"):
+            return False
+        self.cat.clean()
+        return True
+
+    def rest(self):
+        self.cat.rest()
+        return True
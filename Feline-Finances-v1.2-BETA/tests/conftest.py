@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The game's modules live one folder up and are imported by name, like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,23 @@
+from analytics import Series, SpendingStats, day_of
+
+def test_series_buckets_by_time_not_by_transaction():
+    series = Series(8)
+    series.add(100.0, 5, 0)
+    series.add(100.5, 5, 0)  # same second, same bucket
+    series.add(104.0, 0, 3)
+    assert series.cumulative() == [(10, 0), (10, 0), (10, 0), (10, 0), (10, 3)]
+
+def test_series_merges_into_wider_buckets_when_full():
+    series = Series(4)
+    for t in range(4):
+        series.add(t, 1, 0)
+    series.add(9, 0, 1)  # past the 4th bucket twice over
+    assert series.width == 4
+    assert series.buckets == [[4, 0], [0, 0], [0, 1]]
+
+def test_spending_stats_dates_by_the_record():
+    stats = SpendingStats(100)
+    stats.add({"kind": "purchase", "item": "Meowmunch", "amount": -5, "t": 86400 * 30})
+    today = day_of(86400 * 30)
+    assert stats.today(today) == (0, 5)
+    assert stats.week(today + 7) == (0, 0)
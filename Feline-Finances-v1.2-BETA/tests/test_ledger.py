@@ -0,0 +1,112 @@
+import os
+
+from analytics import SpendingStats
+from ledger import SNAPSHOT_EVERY, Ledger
+
+def open_ledger(folder):
+    return Ledger(str(folder / "ledger.jsonl"), str(folder / "ledger_snapshot.json"))
+
+def write_three(folder):
+    ledger = open_ledger(folder)
+    ledger.start(50, 0, {})
+    ledger.append({"kind": "chore", "item": "trash", "amount": 5})
+    ledger.append({"kind": "purchase", "item": "Meowmunch", "amount": -5})
+    ledger.append({"kind": "use", "item": "Meowmunch", "amount": 0})
+    ledger.close()
+
+def test_torn_tail_is_dropped_and_survives_a_reload(tmp_path):
+    write_three(tmp_path)
+    with open(tmp_path / "ledger.jsonl", "ab") as f:
+        f.write(b'{"kind":"purch')  # crash mid-write
+
+    ledger = open_ledger(tmp_path)
+    assert ledger.load() == {"money": 50, "total_spent": 5, "inventory": {"Meowmunch": 0}}
+    ledger.close()  # snapshots right after the load
+
+    ledger = open_ledger(tmp_path)
+    assert ledger.load()["money"] == 50
+    assert [tx["seq"] for tx in ledger.history()] == [1, 2, 3]
+    ledger.append({"kind": "chore", "item": "laundry", "amount": 8})
+    ledger.close()
+
+    ledger = open_ledger(tmp_path)
+    assert ledger.load()["money"] == 58
+    assert [tx["seq"] for tx in ledger.history()] == [1, 2, 3, 4]
+    ledger.close()
+
+def test_log_shorter_than_snapshot_keeps_its_history(tmp_path):
+    write_three(tmp_path)
+    path = tmp_path / "ledger.jsonl"
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    # First record intact, the second cut in half
+    os.truncate(path, len(lines[0]) + len(lines[1]) // 2)
+
+    ledger = open_ledger(tmp_path)
+    assert ledger.load()["money"] == 50  # from the snapshot
+    assert [tx["seq"] for tx in ledger.history()] == [1]
+    ledger.append({"kind": "chore", "item": "trash", "amount": 5})
+    ledger.close()
+
+    ledger = open_ledger(tmp_path)
+    assert ledger.load()["money"] == 55
+    assert [tx["seq"] for tx in ledger.history()] == [1, 4]
+    ledger.close()
+
+def test_missing_log_starts_a_new_one_from_the_snapshot(tmp_path):
+    ledger = open_ledger(tmp_path)
+    ledger.start(50, 0, {})  # snapshot offset 0, no transactions yet
+    ledger.close()
+    os.remove(tmp_path / "ledger.jsonl")
+
+    ledger = open_ledger(tmp_path)
+    assert ledger.load()["money"] == 50
+    ledger.append({"kind": "chore", "item": "trash", "amount": 5})
+    ledger.close()
+
+    ledger = open_ledger(tmp_path)
+    assert ledger.load()["money"] == 55
+    assert [tx["seq"] for tx in ledger.history()] == [1]
+    ledger.close()
+
+def test_records_are_stamped_with_the_given_clock(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger.jsonl"), str(tmp_path / "ledger_snapshot.json"), clock=lambda: 1000.0)
+    ledger.start(50, 0, {})
+    ledger.append({"kind": "chore", "item": "trash", "amount": 5})
+    ledger.close()
+    assert [tx["t"] for tx in open_ledger(tmp_path).history()] == [1000.0]
+
+def open_with_stats(folder, snapshot_every=SNAPSHOT_EVERY):
+    stats = SpendingStats(100)
+    ledger = Ledger(str(folder / "ledger.jsonl"), str(folder / "ledger_snapshot.json"), snapshot_every,
+                    views={"spending": stats})
+    return ledger, stats
+
+def test_views_come_back_from_the_snapshot_and_the_tail(tmp_path):
+    ledger, stats = open_with_stats(tmp_path, snapshot_every=2)
+    ledger.start(50, 0, {})
+    ledger.append({"kind": "chore", "item": "trash", "amount": 5})
+    ledger.append({"kind": "purchase", "item": "Meowmunch", "amount": -5})  # snapshot here
+    ledger.append({"kind": "purchase", "item": "Meowmunch", "amount": -5})  # tail
+    ledger.snapshots.close()  # quit without the closing snapshot
+    ledger.file.close()
+    expected = stats.to_save()
+
+    ledger, stats = open_with_stats(tmp_path)
+    ledger.load()
+    assert stats.to_save() == expected
+    assert stats.by_item == {"Meowmunch": [10, 2]}
+    ledger.close()
+
+def test_views_missing_from_an_old_snapshot_are_rebuilt_from_the_log(tmp_path):
+    write_three(tmp_path)  # no views, like a snapshot from before they existed
+    ledger, stats = open_with_stats(tmp_path)
+    ledger.load()
+    assert (stats.income, stats.expenses) == (5, 5)
+    ledger.append({"kind": "chore", "item": "laundry", "amount": 8})
+    ledger.close()
+
+    ledger, stats = open_with_stats(tmp_path)
+    ledger.load()
+    assert (stats.income, stats.expenses) == (13, 5)
+    ledger.close()
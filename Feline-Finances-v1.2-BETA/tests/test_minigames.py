@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+import pygame
+
+from minigames import EntityPool, SpatialHash
+
+def brute_force(pool, rect):
+    # Positions are floats once things move, so no pygame.Rect here
+    return sorted(i for i in range(pool.capacity)
+                  if pool.alive[i] and pool.x[i] < rect.right and pool.x[i] + pool.w[i] > rect.left
+                  and pool.y[i] < rect.bottom and pool.y[i] + pool.h[i] > rect.top)
+
+def scattered_pool(rng, capacity=300):
+    # Some entities above and left of the origin (negative rows and columns)
+    # and every third one killed again
+    pool = EntityPool(capacity)
+    for _ in range(capacity):
+        pool.spawn(rng.randint(-200, 600), rng.randint(-300, 400), rng.randint(4, 30), rng.randint(4, 30))
+    pool.kill(np.arange(0, capacity, 3))
+    return pool
+
+def test_queries_match_a_brute_force_scan():
+    rng = random.Random(7)
+    pool = scattered_pool(rng)
+    grid = SpatialHash(32, pool.capacity)
+    grid.build(pool)
+    for _ in range(300):
+        rect = pygame.Rect(rng.randint(-250, 600), rng.randint(-350, 400), rng.randint(1, 120), rng.randint(1, 120))
+        assert sorted(grid.overlapping(pool, rect).tolist()) == brute_force(pool, rect)
+        pos = rect.topleft
+        hits = brute_force(pool, pygame.Rect(pos, (1, 1)))
+        assert grid.top(pool, pos) == (max(hits) if hits else None)
+
+def test_rebuild_follows_moves_and_reused_slots():
+    rng = random.Random(3)
+    pool = scattered_pool(rng, 100)
+    grid = SpatialHash(32, pool.capacity)
+    for _ in range(20):
+        pool.vx[:] = [rng.uniform(-400, 400) for _ in range(pool.capacity)]
+        pool.vy[:] = [rng.uniform(-400, 400) for _ in range(pool.capacity)]
+        pool.step(0.1)
+        pool.kill(np.array([rng.randrange(pool.capacity)]))
+        pool.spawn(rng.randint(-100, 300), rng.randint(-100, 300), 10, 10)
+        grid.build(pool)
+        rect = pygame.Rect(rng.randint(-150, 300), rng.randint(-150, 300), 150, 150)
+        assert sorted(grid.overlapping(pool, rect).tolist()) == brute_force(pool, rect)
@@ -0,0 +1,27 @@
+from persistence import SaveWriter, load_save
+
+def test_bad_save_is_recorded_and_the_writer_keeps_going(tmp_path):
+    path = str(tmp_path / "save_data.json")
+    writer = SaveWriter(path)
+    writer.write({"money": object()})  # json can't encode it
+    assert isinstance(writer.error, TypeError)
+    writer.save({"money": 50})
+    writer.close()
+    assert load_save(path) == {"money": 50}
+
+def test_failing_hook_is_recorded_and_the_writer_keeps_going(tmp_path):
+    path = str(tmp_path / "save_data.json")
+    seen = []
+
+    def on_write(data, extra):
+        seen.append(data["money"])
+        if data["money"] == 50:
+            raise ValueError("no thumbnail")
+
+    writer = SaveWriter(path, on_write)
+    writer.write({"money": 50})
+    assert isinstance(writer.error, ValueError)
+    writer.save({"money": 60})
+    writer.close()
+    assert seen == [50, 60]
+    assert load_save(path) == {"money": 60}
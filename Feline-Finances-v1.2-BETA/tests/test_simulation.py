@@ -0,0 +1,79 @@
+from collections import Counter
+
+from simulation import MOODS, TICK_MS, Cat, Household, Simulation, get_mood
+
+def test_batched_moods_match_get_mood():
+    household = Household()
+    for hunger, happiness, energy, cleanliness in [(100, 100, 100, 100), (10, 20, 30, 40), (90, 30, 60, 80),
+                                                   (50, 50, 90, 50), (40, 40, 40, 40), (100, 39, 95, 100)]:
+        cat = Cat("Cat", "Grey", "Shy", household)
+        cat.hunger, cat.happiness, cat.energy, cat.cleanliness = hunger, happiness, energy, cleanliness
+    household.update_health()
+
+    expected = Counter(get_mood(cat) for cat in household)
+    assert household.mood_counts() == {mood: expected[mood] for mood in MOODS}
+    assert [MOODS[i] for i in household.moods()] == [get_mood(cat) for cat in household]
+
+def test_care_goes_to_the_cat_on_screen_and_the_save_keeps_the_choice():
+    sim = Simulation(Cat("Tom", "Grey", "Lazy"), inventory={"Meowmunch": 1})
+    mi = sim.adopt(Cat("Mi", "White", "Shy"))
+    tom = sim.cat
+    tom.hunger = mi.hunger = 10
+    assert sim.next_cat() is mi
+    sim.feed()
+    assert (tom.hunger, mi.hunger) == (10, 30)
+
+    data = sim.to_save()
+    assert (data["name"], data["selected"], [cat["name"] for cat in data["housemates"]]) == ("Tom", 1, ["Mi"])
+    loaded = Simulation.from_save(data)
+    assert loaded.cat.name == "Mi"
+    assert loaded.next_cat().name == "Tom"
+
+def test_mood_counts_follow_every_change():
+    household = Household()
+    tom = Cat("Tom", "Grey", "Lazy", household)
+    assert household.mood_counts()["Energetic"] == 1
+    tom.energy = 50
+    assert household.mood_counts()["Happy"] == 1
+    household.decay(40)
+    assert household.mood_counts()["Sick"] == 1
+    Cat("Mi", "White", "Shy", household)
+    assert household.mood_counts() == {"Happy": 0, "Sick": 1, "Sad": 0, "Energetic": 1}
+
+def stats(sim):
+    return [cat.stats() for cat in sim.household]
+
+def test_advance_carries_leftover_time_into_the_next_call():
+    sim = Simulation(Cat("Tom", "Grey", "Lazy"))
+    assert sim.advance(TICK_MS * 0.6) == 0
+    assert sim.advance(TICK_MS * 0.6) == 1  # 0.6 + 0.6 of a tick
+    assert sim.accumulator == TICK_MS * 0.2
+    assert sim.elapsed == TICK_MS
+    assert sim.cat.hunger == 98
+
+def test_time_scale_fast_forwards():
+    sim = Simulation(Cat("Tom", "Grey", "Lazy"), time_scale=60)
+    assert sim.advance(1000) == 60 * 1000 // TICK_MS
+    assert sim.elapsed == 60 * 1000
+
+def test_catch_up_matches_stepping_tick_by_tick():
+    def household():
+        sim = Simulation(Cat("Tom", "Grey", "Lazy"))
+        sim.adopt(Cat("Mi", "White", "Shy")).hunger = 30
+        sim.decay_rates["happiness"] = 1.5
+        return sim
+
+    stepped, caught_up = household(), household()
+    for _ in range(50):
+        stepped.step()
+    assert caught_up.catch_up(50 * TICK_MS + 1234) == 50
+    assert stats(caught_up) == stats(stepped)
+    assert caught_up.elapsed == stepped.elapsed
+    assert caught_up.accumulator == 1234
+
+def test_decaying_stats_reads_one_row():
+    household = Household()
+    Cat("Tom", "Grey", "Lazy", household)
+    mi = Cat("Mi", "White", "Shy", household)
+    mi.hunger, mi.happiness, mi.energy, mi.cleanliness = 10, 20.5, 30, 40
+    assert household.decaying_stats(mi.row) == [10, 20.5, 30, 40]
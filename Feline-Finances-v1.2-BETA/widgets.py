@@ -0,0 +1,103 @@
+import pygame
+
+CELL_SIZE = 64  # px per side of a spatial index cell
+
+# -------------------- WIDGET --------------------
+class Widget:
+    # A fixed rectangle in screen coordinates that can be hovered and
+    # clicked. Widgets form a tree; hiding one hides its whole subtree, and a
+    # widget without a rect only groups its children. on_click(event) runs
+    # for clicks that land on the widget, tooltip() (if given) returns the
+    # text to show while it is hovered.
+    def __init__(self, rect=None, label="", on_click=None, tooltip=None):
+        self.rect = None if rect is None else pygame.Rect(rect)
+        self.label = label
+        self.on_click = on_click
+        self.tooltip = tooltip
+        self.parent = None
+        self.children = []
+        self.tree = None
+        self.shown = True
+        self.visible = True  # shown, and so is every ancestor
+        self.hovered = False
+
+    def add(self, child):
+        child.parent = self
+        self.children.append(child)
+        if self.tree is not None:
+            self.tree.attach(child)
+        return child
+
+    def show(self, shown=True):
+        if shown == self.shown:
+            return
+        self.shown = shown
+        self.update_visible()
+        if self.tree is not None:
+            self.tree.refresh()
+
+    def update_visible(self):
+        self.visible = self.shown and (self.parent is None or self.parent.visible)
+        for child in self.children:
+            child.update_visible()
+
+# -------------------- WIDGET TREE --------------------
+class WidgetTree:
+    # Root of the widget tree plus a grid spatial index. Layout is fixed once
+    # a widget is added, so each widget is filed under the cells its rect
+    # covers exactly once, top-most first (widgets added later sit on top).
+    # A hit test looks at the one cell under the point and stops at the first
+    # visible widget containing it. Hover follows the mouse events passed to
+    # dispatch() and is rechecked whenever a widget is shown or hidden.
+    def __init__(self):
+        self.cells = {}
+        self.pointer = None
+        self.hovered = None
+        self.root = Widget()
+        self.attach(self.root)
+
+    def add(self, widget):
+        return self.root.add(widget)
+
+    def attach(self, widget):
+        widget.tree = self
+        widget.update_visible()
+        if widget.rect is not None:
+            rect = widget.rect
+            for cx in range(rect.left // CELL_SIZE, (rect.right - 1) // CELL_SIZE + 1):
+                for cy in range(rect.top // CELL_SIZE, (rect.bottom - 1) // CELL_SIZE + 1):
+                    self.cells.setdefault((cx, cy), []).insert(0, widget)
+        for child in widget.children:
+            self.attach(child)
+
+    def hit(self, pos):
+        for widget in self.cells.get((pos[0] // CELL_SIZE, pos[1] // CELL_SIZE), ()):
+            if widget.visible and widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+    def move(self, pos):
+        self.pointer = pos
+        self.refresh()
+
+    def refresh(self):
+        widget = None if self.pointer is None else self.hit(self.pointer)
+        if widget is self.hovered:
+            return
+        if self.hovered is not None:
+            self.hovered.hovered = False
+        if widget is not None:
+            widget.hovered = True
+        self.hovered = widget
+
+    def dispatch(self, event):
+        # Returns True if a widget handled the event
+        if event.type == pygame.MOUSEMOTION:
+            self.move(event.pos)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self.move(event.pos)
+            widget = self.hovered
+            if widget is not None and widget.on_click is not None:
+                widget.on_click(event)
+                return True
+        return False